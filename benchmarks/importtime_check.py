@@ -0,0 +1,57 @@
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+ENTRY_POINT = os.path.join(SOURCE_DIRECTORY, "veracode-start-scan.py")
+INTERPRETER_MODULES = ["site", "encodings", "sitecustomize", "usercustomize"]
+DEFERRED_MODULES = ["VeracodeApi", "ApiSession", "veracode_api_py", "requests", "PreScan", "PipelineScan", "PlatformScan", "NativeUpload", "ResultPoller", "AgentScanner", "VeracodeCli"]
+DEFAULT_CAP_IN_MS = 150
+STARTUP_INVOCATIONS = {"--help": ["--help"],
+                       "invalid input": ["-a", "application", "-v", "scan", "-bc", "High", "-t", "team", "-st", "folder", "-s", "missing-source",
+                                         "-vid", "id", "-vkey", "key", "-cli", "missing-cli", "-wra", "missing-wrapper"]}
+
+def parse_import_times(output):
+    import_times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_time, module_name = line.split("|")
+        if cumulative_time.strip().isdigit():
+            import_times[module_name.rstrip()] = int(cumulative_time)
+    return import_times
+
+def get_top_level_import_time(import_times):
+    return sum(cumulative_time for module_name, cumulative_time in import_times.items()
+               if not module_name.startswith("  ") and module_name.strip() not in INTERPRETER_MODULES)
+
+def measure_startup(arguments):
+    output = subprocess.run([sys.executable, "-X", "importtime", ENTRY_POINT] + arguments, cwd=SOURCE_DIRECTORY, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+                            env=dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SOURCE_DIRECTORY, os.environ.get("PYTHONPATH")])))).stderr
+    return parse_import_times(output)
+
+def main():
+    parser = argparse.ArgumentParser(description="Fails if the start-up imports of the entry point exceed a time cap or load the API modules before they are used.")
+    parser.add_argument("-c", "--cap", help=f"Maximum start-up import time in milliseconds (median of all runs) - defaults to {DEFAULT_CAP_IN_MS}.", type=int, default=DEFAULT_CAP_IN_MS)
+    parser.add_argument("-r", "--runs", help="Number of runs (the median is compared with the cap).", type=int, default=5)
+    args = parser.parse_args()
+
+    errors = []
+    for invocation_name, arguments in STARTUP_INVOCATIONS.items():
+        measurements = [measure_startup(arguments) for _ in range(args.runs)]
+        for module_name in DEFERRED_MODULES:
+            if any(module_name in map(str.strip, import_times) for import_times in measurements):
+                errors.append(f"{module_name} is imported at start-up ({invocation_name}), it should only be imported when first used")
+        startup_time = statistics.median(map(get_top_level_import_time, measurements)) / 1000
+        print(f"Start-up import time ({invocation_name}): {startup_time:.1f} ms (cap: {args.cap} ms)")
+        if startup_time > args.cap:
+            errors.append(f"Start-up import time ({invocation_name}) of {startup_time:.1f} ms exceeds the cap of {args.cap} ms")
+
+    for error in errors:
+        print(f"FAILED: {error}")
+    sys.exit(1 if errors else 0)
+
+if __name__ == '__main__':
+    main()
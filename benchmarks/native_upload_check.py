@@ -0,0 +1,153 @@
+import os
+import sys
+import json
+import tempfile
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SOURCE_DIRECTORY)
+os.environ.setdefault("VERACODE_API_KEY_ID", "0" * 32)
+os.environ.setdefault("VERACODE_API_KEY_SECRET", "0" * 128)
+
+from veracode_api_py import apihelper
+from veracode_api_py.constants import Constants
+from veracode_api_py.xmlapi import XMLAPI
+from ApiSession import configure_api_session
+from ScanConfiguration import ScanConfiguration
+import NativeUpload
+
+STAND_IN_REGION = "stand-in"
+BUILD_INFO = '<buildinfo xmlns="https://analysiscenter.veracode.com/schema/4.0/buildinfo" app_id="1" sandbox_id="{sandbox_id}">{build}</buildinfo>'
+BUILD = '<build version="{version}" build_id="{build_id}"><analysis_unit analysis_type="Static" status="{status}"/></build>'
+PRESCAN_RESULTS = ('<prescanresults xmlns="https://analysiscenter.veracode.com/schema/2.0/prescanresults" app_id="1" build_id="{build_id}">'
+                   '<module id="11" name="app.jar" is_dependency="false" has_fatal_errors="false"/>'
+                   '<module id="12" name="App.jar" is_dependency="false" has_fatal_errors="false"/>'
+                   '<module id="13" name="lib[1].jar" is_dependency="false" has_fatal_errors="false"/>'
+                   '<module id="14" name="broken.jar" is_dependency="false" has_fatal_errors="true"/></prescanresults>')
+
+class StandIn:
+    def __init__(self, prescan_status):
+        self.prescan_status = prescan_status
+        self.build = None
+        self.calls = []
+        self.selected_modules = None
+        self.lock = threading.Lock()
+
+    def handle(self, endpoint, parameters, body):
+        with self.lock:
+            self.calls.append(endpoint)
+            if endpoint.endswith("/sandboxes"):
+                return "application/json", json.dumps({"_embedded": {"sandboxes": [{"id": 7, "name": "stand-in sandbox"}]}, "page": {"total_pages": 1}})
+            if endpoint == "getbuildinfo.do":
+                build = BUILD.format(**self.build) if self.build else ""
+                return "text/xml", BUILD_INFO.format(sandbox_id=parameters.get("sandbox_id", ""), build=build)
+            if endpoint == "createbuild.do":
+                self.build = {"version": parameters["version"], "build_id": "101", "status": "Incomplete"}
+                return "text/xml", BUILD_INFO.format(sandbox_id=parameters.get("sandbox_id", ""), build=BUILD.format(**self.build))
+            if endpoint == "uploadfile.do":
+                return "text/xml", '<filelist xmlns="https://analysiscenter.veracode.com/schema/2.0/filelist"/>'
+            if endpoint == "beginprescan.do":
+                self.build["status"] = "Pre-Scan Submitted" if parameters["auto_scan"] == "false" else "Submitted to Engine"
+                return "text/xml", BUILD_INFO.format(sandbox_id=parameters.get("sandbox_id", ""), build=BUILD.format(**self.build))
+            if endpoint == "getprescanresults.do":
+                return "text/xml", PRESCAN_RESULTS.format(build_id=parameters["build_id"])
+            if endpoint == "beginscan.do":
+                self.build["status"] = "Submitted to Engine"
+                self.selected_modules = parameters["modules"]
+                return "text/xml", BUILD_INFO.format(sandbox_id=parameters.get("sandbox_id", ""), build=BUILD.format(**self.build))
+            return "text/xml", f"<error>Unexpected call to {endpoint}</error>"
+
+    def advance_prescan(self):
+        with self.lock:
+            if self.build and self.build["status"] == "Pre-Scan Submitted":
+                self.build["status"] = self.prescan_status
+
+def create_handler(stand_in):
+    class StandInHandler(BaseHTTPRequestHandler):
+        def respond(self, body):
+            url = urlparse(self.path)
+            parameters = {name: values[0] for name, values in parse_qs(url.query).items()}
+            content_type, response = stand_in.handle(url.path.rsplit("/", 1)[-1] if url.path.endswith(".do") else url.path, parameters, body)
+            if url.path.endswith("getbuildinfo.do"):
+                stand_in.advance_prescan()
+            encoded_response = response.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(encoded_response)))
+            self.end_headers()
+            self.wfile.write(encoded_response)
+
+        def do_GET(self):
+            self.respond(b"")
+
+        def do_POST(self):
+            self.respond(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+
+        def log_message(self, *_):
+            pass
+    return StandInHandler
+
+def point_api_at(server):
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    Constants.REGIONS[STAND_IN_REGION] = {"base_xml_url": f"{base_url}/api", "base_rest_url": f"{base_url}/"}
+    apihelper.APIHelper.region = STAND_IN_REGION
+    XMLAPI.baseurl = apihelper.APIHelper().baseurl
+
+def create_scan_configuration(source, include=None, exclude=None):
+    scan_configuration = ScanConfiguration.__new__(ScanConfiguration)
+    scan_configuration.application_guid = "00000000-0000-0000-0000-000000000001"
+    scan_configuration.application_legacy_id = "1"
+    scan_configuration.sandbox_name = "stand-in sandbox"
+    scan_configuration.version = "stand-in scan"
+    scan_configuration.source = source
+    scan_configuration.include = include
+    scan_configuration.exclude = exclude
+    scan_configuration.delete_incomplete_scan = "0"
+    scan_configuration.scan_timeout = 0
+    scan_configuration.override_failure = False
+    return scan_configuration
+
+def run_scenario(name, scan_configuration, prescan_status="Pre-Scan Success"):
+    stand_in = StandIn(prescan_status)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), create_handler(stand_in))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    point_api_at(server)
+    try:
+        returned_value = NativeUpload.run_native_scan(scan_configuration, name)
+    finally:
+        server.shutdown()
+    return stand_in, returned_value
+
+def main():
+    configure_api_session(4)
+    NativeUpload.STATUS_POLL_INITIAL_DELAY = 0.05
+    NativeUpload.STATUS_POLL_MAX_DELAY = 0.05
+    errors = []
+    with tempfile.TemporaryDirectory() as source:
+        for file_name in ["app.jar", "App.jar", "lib[1].jar"]:
+            with open(os.path.join(source, file_name), 'w') as source_file:
+                source_file.write("stand-in file contents")
+
+        stand_in, returned_value = run_scenario("Auto scan", create_scan_configuration(source))
+        if returned_value[0] != 0 or stand_in.calls.count("uploadfile.do") != 3 or "beginprescan.do" not in stand_in.calls or "beginscan.do" in stand_in.calls:
+            errors.append(f"Auto scan: unexpected result {returned_value} with calls {stand_in.calls}")
+
+        stand_in, returned_value = run_scenario("Selected modules", create_scan_configuration(source, include="*.jar", exclude="App.jar"))
+        if returned_value[0] != 0 or stand_in.selected_modules != "11,13":
+            errors.append(f"Selected modules: expected modules 11,13, got {stand_in.selected_modules} ({returned_value})")
+
+        NativeUpload.PRESCAN_TIMEOUT_IN_MINUTES = 0.01
+        stand_in, returned_value = run_scenario("Stalled pre-scan", create_scan_configuration(source, include="*.jar"), prescan_status="Pre-Scan Submitted")
+        if returned_value[0] != 1 or returned_value[2] != "101" or "did not finish" not in returned_value[1] or "beginscan.do" in stand_in.calls:
+            errors.append(f"Stalled pre-scan: expected a failed result for build 101 before beginscan, got {returned_value}")
+
+    for error in errors:
+        print(f"FAILED: {error}")
+    if not errors:
+        print("Native upload engine: createbuild, uploadfile, beginprescan and beginscan behaved as expected against the stand-in")
+    sys.exit(1 if errors else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import os
+import sys
+import json
+import argparse
+import importlib.util
+import statistics
+import subprocess
+
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+MEASURE_IMPORT = """
+import sys, time, json
+start_time = time.perf_counter()
+for module_name in sys.argv[1:]:
+    __import__(module_name)
+elapsed_time = time.perf_counter() - start_time
+try:
+    import resource
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    max_rss = max_rss / 1024 if sys.platform == "darwin" else max_rss
+except ImportError:
+    max_rss = None
+print(json.dumps({"seconds": elapsed_time, "max_rss_kb": max_rss}))
+"""
+
+def measure_import(module_names, runs):
+    measurements = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", MEASURE_IMPORT] + module_names, cwd=SOURCE_DIRECTORY, stdout=subprocess.PIPE, check=True,
+                                env=dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SOURCE_DIRECTORY, os.environ.get("PYTHONPATH")])))).stdout
+        measurements.append(json.loads(output))
+    max_rss = [measurement["max_rss_kb"] for measurement in measurements if measurement["max_rss_kb"] is not None]
+    return statistics.median(map(lambda measurement: measurement["seconds"], measurements)), statistics.median(max_rss) if max_rss else None
+
+def print_measurement(label, measurement):
+    seconds, max_rss = measurement
+    print(f"{label:<40} {seconds * 1000:>10.1f} ms {f'{max_rss / 1024:>10.1f} MB' if max_rss is not None else '       n/a'}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures the time and memory needed to import the modules used on every invocation.")
+    parser.add_argument("-r", "--runs", help="Number of runs per measurement (the median is reported).", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'Imports':<40} {'Time':>13} {'Max RSS':>13}")
+    print_measurement("VeracodeApi", measure_import(["VeracodeApi"], args.runs))
+    if importlib.util.find_spec("pandas"):
+        print_measurement("VeracodeApi + pandas (previous)", measure_import(["VeracodeApi", "pandas"], args.runs))
+    else:
+        print("pandas is not installed, skipping the comparison with the previous import graph")
+
+if __name__ == '__main__':
+    main()
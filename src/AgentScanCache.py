@@ -0,0 +1,53 @@
+import os
+import json
+import hashlib
+from pathlib import Path
+from MetadataCache import get_user_cache_directory
+from ResultCache import get_file_hash
+from ErrorHandler import show_warning
+from Constants import SCA_CACHE_DIRECTORY_NAME, SCA_MANIFEST_FILE_NAMES, SCA_MANIFEST_FILE_EXTENSIONS, SCA_IGNORED_DIRECTORIES
+
+def is_manifest_file(file_name):
+    return file_name in SCA_MANIFEST_FILE_NAMES or file_name.endswith(tuple(SCA_MANIFEST_FILE_EXTENSIONS))
+
+def get_sub_project_root(directory, sub_projects):
+    for sub_project in sub_projects:
+        if directory == sub_project or directory.startswith(sub_project + os.sep):
+            return sub_project
+    return directory
+
+def find_sub_projects(scan_root):
+    sub_projects = {}
+    for directory, directories, files in os.walk(scan_root):
+        directories[:] = sorted(child for child in directories if child not in SCA_IGNORED_DIRECTORIES)
+        manifest_files = [os.path.join(directory, file_name) for file_name in files if is_manifest_file(file_name)]
+        if manifest_files:
+            sub_projects.setdefault(get_sub_project_root(directory, sub_projects), []).extend(manifest_files)
+    return sub_projects
+
+def get_manifest_hash(scan_root, manifest_files):
+    manifest_hash = hashlib.sha256()
+    for manifest_file in sorted(manifest_files):
+        manifest_hash.update(f"{os.path.relpath(manifest_file, scan_root)}|{get_file_hash(manifest_file)}".encode("utf-8"))
+    return manifest_hash.hexdigest()
+
+def get_sca_cache_entry_location(sub_project, scan_configuration):
+    entry_name = hashlib.sha256(f"{scan_configuration.workspace_guid}|{os.path.abspath(sub_project)}".encode("utf-8")).hexdigest()
+    entry_directory = os.path.join(get_user_cache_directory(), SCA_CACHE_DIRECTORY_NAME)
+    Path(entry_directory).mkdir(parents=True, exist_ok=True)
+    return os.path.join(entry_directory, f"{entry_name}.json")
+
+def get_cached_sca_result(sub_project, manifest_hash, scan_configuration):
+    try:
+        with open(get_sca_cache_entry_location(sub_project, scan_configuration), 'r') as entry_file:
+            entry = json.load(entry_file)
+    except (OSError, ValueError):
+        return None
+    return entry if entry.get("manifest_hash") == manifest_hash else None
+
+def save_sca_result(sub_project, manifest_hash, returned_value, project_guid, scan_configuration):
+    try:
+        with open(get_sca_cache_entry_location(sub_project, scan_configuration), 'w') as entry_file:
+            json.dump({"manifest_hash": manifest_hash, "returned_value": list(returned_value), "project_guid": project_guid}, entry_file)
+    except OSError as e:
+        show_warning(f"Unable to save agent-based SCA result to cache: {e}")
@@ -1,25 +1,79 @@
-from VeracodeApi import link_sca_project, get_agent_sbom, get_scan_project_guid
+import os
+from concurrent.futures import ThreadPoolExecutor
+from VeracodeApi import link_sca_project, get_agent_sbom, get_scan_project_guid, get_project_sbom
 from CliCaller import call_subprocess, save_sbom_file
+from ParallelScanHandler import store_result, is_cancelled
+from AgentScanCache import find_sub_projects, get_manifest_hash, get_cached_sca_result, save_sca_result
 
 def run_agent_sca(returned_values, results_file, scan_configuration):
+    if scan_configuration.incremental_sca:
+        sub_projects = find_sub_projects(scan_configuration.srcclr_to_scan)
+        if sub_projects:
+            run_incremental_agent_sca(returned_values, results_file, sub_projects, scan_configuration)
+            return
+
     sca_results = run_agent_sca_inner(results_file, scan_configuration)
+    scan_configuration.project_guid = get_sca_project_guid(sca_results, scan_configuration)
+    store_result(returned_values, "SCA Scan", sca_results)
+
+    if scan_configuration.sbom_type and not is_cancelled(sca_results):
+        save_sbom_file(get_agent_sbom(scan_configuration), scan_configuration)
+
+def get_sca_project_guid(sca_results, scan_configuration):
     if scan_configuration.link_project and sca_results[2]:
-        scan_configuration.project_guid = link_sca_project(sca_results[2], scan_configuration)
+        return link_sca_project(sca_results[2], scan_configuration)
     elif sca_results[2]:
-        scan_configuration.project_guid = get_scan_project_guid(sca_results[2], scan_configuration)
-    returned_values["SCA Scan"] = sca_results
+        return get_scan_project_guid(sca_results[2], scan_configuration)
+    return None
+
+def get_sub_project_name(sub_project, scan_configuration):
+    relative_path = os.path.relpath(sub_project, scan_configuration.srcclr_to_scan)
+    return "root" if relative_path == "." else relative_path.replace(os.sep, "_")
+
+def run_incremental_agent_sca(returned_values, results_file, sub_projects, scan_configuration):
+    project_guids = {}
+    changed_sub_projects = []
+    for sub_project, manifest_files in sub_projects.items():
+        sub_project_name = get_sub_project_name(sub_project, scan_configuration)
+        manifest_hash = get_manifest_hash(scan_configuration.srcclr_to_scan, manifest_files)
+        cached_result = get_cached_sca_result(sub_project, manifest_hash, scan_configuration)
+        if cached_result:
+            returned_value = cached_result["returned_value"]
+            store_result(returned_values, f"SCA Scan ({sub_project_name})", (returned_value[0], f"{returned_value[1].strip()} - dependencies unchanged since the last scan", returned_value[2]))
+            project_guids[sub_project_name] = cached_result["project_guid"]
+        else:
+            changed_sub_projects.append((sub_project, sub_project_name, manifest_hash))
+
+    if changed_sub_projects:
+        results_file_name, results_file_extension = os.path.splitext(results_file)
+        with ThreadPoolExecutor(max_workers=min(scan_configuration.max_parallel_sca_scans, len(changed_sub_projects))) as executor:
+            sub_project_scans = {sub_project_name: executor.submit(run_sub_project_sca, returned_values, f"{results_file_name}-{sub_project_name}{results_file_extension}",
+                                                                   sub_project, sub_project_name, manifest_hash, scan_configuration)
+                                 for sub_project, sub_project_name, manifest_hash in changed_sub_projects}
+            for sub_project_name, sub_project_scan in sub_project_scans.items():
+                project_guids[sub_project_name] = sub_project_scan.result()
 
     if scan_configuration.sbom_type:
-        save_sbom_file(get_agent_sbom(scan_configuration), scan_configuration)
+        for sub_project_name, project_guid in project_guids.items():
+            if project_guid:
+                save_sbom_file(get_project_sbom(project_guid, scan_configuration), scan_configuration, f"{scan_configuration.application}-{sub_project_name}")
+
+def run_sub_project_sca(returned_values, results_file, sub_project, sub_project_name, manifest_hash, scan_configuration):
+    sca_results = run_agent_sca_inner(results_file, scan_configuration, sub_project, f"Running SCA Scan ({sub_project_name})")
+    project_guid = get_sca_project_guid(sca_results, scan_configuration) if not is_cancelled(sca_results) else None
+    store_result(returned_values, f"SCA Scan ({sub_project_name})", sca_results)
+    if sca_results[0] == 0:
+        save_sca_result(sub_project, manifest_hash, sca_results, project_guid, scan_configuration)
+    return project_guid
 
-def run_agent_sca_inner(results_file, scan_configuration):
-    commands=["srcclr", "scan", scan_configuration.srcclr_to_scan, "--recursive", "--allow-dirty"]
+def run_agent_sca_inner(results_file, scan_configuration, scan_target=None, process_id="Running SCA Scan"):
+    commands=["srcclr", "scan", scan_target or scan_configuration.srcclr_to_scan, "--recursive", "--allow-dirty"]
     if scan_configuration.verbose:
         commands.append("--debug")
-    return call_subprocess(process_id="Running SCA Scan", scan_configuration=scan_configuration, fail_on_error=False, 
+    return call_subprocess(process_id=process_id, scan_configuration=scan_configuration, fail_on_error=False,
                             commands=commands,
                             additional_env=[{"name": "SRCCLR_API_URL", "value": scan_configuration.srcclr_api_url},
                                             {"name": "SRCCLR_API_TOKEN", "value": scan_configuration.srcclr_token}],
                             results_file=results_file,
-                            shell=True,
+                            shell=os.name == "nt",
                             return_line_filter=["Full Report Details", "https://"])
@@ -0,0 +1,115 @@
+import threading
+import requests
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+from urllib3 import ProxyManager
+from urllib3.util.retry import Retry
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from veracode_api_py import apihelper
+from veracode_api_py.xmlapi import XMLAPI
+from veracode_api_signing.credentials import get_credentials
+from veracode_api_signing.regions import get_region_for_api_credential
+from veracode_api_signing.plugin_requests import RequestsAuthPluginVeracodeHMAC
+from ColourHandler import INFO_PREFIX_COLOUR, RESET_STYLE
+from Constants import API_CONNECTION_RETRIES, API_CONNECTIONS_OPENED, API_REQUESTS_SERVED
+
+api_session = None
+api_auth = None
+api_session_lock = threading.Lock()
+api_session_statistics = {API_CONNECTIONS_OPENED: 0, API_REQUESTS_SERVED: 0}
+api_session_statistics_lock = threading.Lock()
+
+def increment_statistic(statistic):
+    with api_session_statistics_lock:
+        api_session_statistics[statistic] += 1
+
+def get_api_session_statistics():
+    with api_session_statistics_lock:
+        return dict(api_session_statistics)
+
+def print_api_session_statistics():
+    statistics = get_api_session_statistics()
+    print(f"{INFO_PREFIX_COLOUR}Veracode API:{RESET_STYLE} {statistics[API_REQUESTS_SERVED]} requests served over {statistics[API_CONNECTIONS_OPENED]} connections")
+
+class CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        increment_statistic(API_CONNECTIONS_OPENED)
+        return super()._new_conn()
+
+class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        increment_statistic(API_CONNECTIONS_OPENED)
+        return super()._new_conn()
+
+COUNTING_POOL_CLASSES = {"http": CountingHTTPConnectionPool, "https": CountingHTTPSConnectionPool}
+
+class PooledHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = COUNTING_POOL_CLASSES
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        proxy_manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        if isinstance(proxy_manager, ProxyManager):
+            proxy_manager.pool_classes_by_scheme = COUNTING_POOL_CLASSES
+        return proxy_manager
+
+    def send(self, request, **kwargs):
+        increment_statistic(API_REQUESTS_SERVED)
+        return super().send(request, **kwargs)
+
+class SharedSession:
+    # Stands in for the requests.Session() veracode_api_py creates for every call, the adapters it mounts are replaced by the pooled ones
+    def mount(self, prefix, adapter):
+        pass
+
+    def send(self, request, **kwargs):
+        return api_session.send(request, **kwargs)
+
+class PooledRequests:
+    Session = SharedSession
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+    def get(self, url, **kwargs):
+        return api_session.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return api_session.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return api_session.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return api_session.request("DELETE", url, **kwargs)
+
+def create_api_session(pool_size):
+    session = requests.Session()
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    adapter = PooledHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=Retry(API_CONNECTION_RETRIES, read=False, respect_retry_after_header=False))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def configure_api_session(pool_size):
+    global api_session, api_auth
+    with api_session_lock:
+        if api_session is not None:
+            return
+        api_key_id, api_key_secret = get_credentials()
+        api_auth = RequestsAuthPluginVeracodeHMAC(api_key_id, api_key_secret)
+        apihelper.APIHelper.api_key_id = api_key_id
+        apihelper.APIHelper.api_key_secret = api_key_secret
+        apihelper.APIHelper.region = get_region_for_api_credential(api_key_id)
+        XMLAPI.baseurl = apihelper.APIHelper().baseurl
+        apihelper.RequestsAuthPluginVeracodeHMAC = lambda *_: api_auth
+        api_session = create_api_session(pool_size)
+        apihelper.requests = PooledRequests()
+
+def stream_api_request(url, params):
+    response = api_session.get(url, params=params, auth=api_auth, headers={"User-Agent": "api.py"}, stream=True)
+    if not response.ok:
+        response.close()
+    response.raise_for_status()
+    return response
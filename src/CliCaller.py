@@ -1,18 +1,73 @@
 import subprocess
 import os
 import io
+import gzip
 import json
+import queue
+import signal
+import threading
+from collections import deque
 
 from ColourHandler import INFO_PREFIX_COLOUR, RESET_STYLE
 from ErrorHandler import exit_with_error
 from ScanConfiguration import ScanConfiguration
-from Constants import FILE_TYPE, FILE_LOCATION
+from ParallelScanHandler import add_generated_output_file
+from Constants import ERROR_TAIL_SIZE, PROCESS_TERMINATION_GRACE_PERIOD, CANCELLED_RETURN_CODE, TIMED_OUT_RETURN_CODE, SBOM_COMPRESSION_EXTENSIONS, SBOM_CHUNK_SIZE
 
+running_processes = set()
+cancelled_processes = set()
+process_lock = threading.Lock()
+cancellation_requested = threading.Event()
 
-def handle_error(fail_on_error, error_message, return_code, scan_id, scan_configuration):
-    if return_code and return_code != 0 and fail_on_error:
+def start_process(commands, cwd, environment, shell):
+    with process_lock:
+        if cancellation_requested.is_set():
+            return None
+        process = subprocess.Popen(args=commands, cwd=cwd, env=environment, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=shell, start_new_session=os.name == "posix")
+        running_processes.add(process)
+    return process
+
+def send_signal(process, posix_signal):
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, posix_signal)
+        elif posix_signal == signal.SIGTERM:
+            process.terminate()
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+def terminate_processes(processes):
+    processes = [process for process in processes if process.poll() is None]
+    for process in processes:
+        send_signal(process, signal.SIGTERM)
+    for process in processes:
+        try:
+            process.wait(timeout=PROCESS_TERMINATION_GRACE_PERIOD)
+        except subprocess.TimeoutExpired:
+            send_signal(process, signal.SIGKILL if os.name == "posix" else signal.SIGTERM)
+
+def cancel_all_processes():
+    cancellation_requested.set()
+    with process_lock:
+        processes = list(running_processes)
+        cancelled_processes.update(processes)
+    terminate_processes(processes)
+
+def start_watchdog(process, timed_out: threading.Event, timeout_in_minutes):
+    def on_timeout():
+        timed_out.set()
+        terminate_processes([process])
+    watchdog = threading.Timer(timeout_in_minutes * 60, on_timeout)
+    watchdog.daemon = True
+    watchdog.start()
+    return watchdog
+
+def handle_error(fail_on_error, error_message, return_code, scan_id, scan_configuration, cancelled=False):
+    if return_code and return_code != 0 and fail_on_error and not cancelled:
         exit_with_error(error_message, return_code, scan_configuration)
-    return return_code, error_message, scan_id
+    return return_code, error_message, scan_id, cancelled
 
 def call_subprocess(process_id, scan_configuration: ScanConfiguration, fail_on_error: bool, commands : list[str],
                     additional_env=[], results_file=None, shell=False, return_line_filter=[]):
@@ -22,33 +77,73 @@ def call_subprocess(process_id, scan_configuration: ScanConfiguration, fail_on_e
         environment["VERACODE_API_KEY_SECRET"] = scan_configuration.vkey
         for additional_environment_variable in additional_env:
             environment[additional_environment_variable["name"]] = additional_environment_variable["value"]
-        process = subprocess.Popen(args=commands, cwd=scan_configuration.base_cli_directory, env=environment, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=shell)
+        process = start_process(commands, scan_configuration.base_cli_directory, environment, shell)
+        if not process:
+            return handle_error(fail_on_error, "Cancelled before starting", CANCELLED_RETURN_CODE, '', scan_configuration, cancelled=True)
+        timed_out = threading.Event()
+        watchdog = start_watchdog(process, timed_out, scan_configuration.process_timeout) if scan_configuration.process_timeout else None
         last_line = ''
         scan_id = ''
-        if results_file:
-            with open(results_file, 'w') as output_file:
-                last_line, scan_id = handle_output(process_id, process, output_file, return_line_filter)
-        else:
-            last_line, scan_id = handle_output(process_id, process, None, return_line_filter)
-        process.wait()
-        return handle_error(fail_on_error, last_line, process.returncode, scan_id, scan_configuration)
+        try:
+            if results_file:
+                with open(results_file, 'w') as output_file:
+                    last_line, scan_id, error_tail = handle_output(process_id, process, output_file, return_line_filter)
+            else:
+                last_line, scan_id, error_tail = handle_output(process_id, process, None, return_line_filter)
+            process.wait()
+        finally:
+            if watchdog:
+                watchdog.cancel()
+            with process_lock:
+                running_processes.discard(process)
+                was_cancelled = process in cancelled_processes
+                cancelled_processes.discard(process)
+        return_code = process.returncode
+        cancelled = False
+        if timed_out.is_set():
+            return_code = TIMED_OUT_RETURN_CODE
+            last_line = f"Timed out after {scan_configuration.process_timeout} minutes"
+        elif return_code and was_cancelled:
+            return_code = CANCELLED_RETURN_CODE
+            last_line = "Cancelled"
+            cancelled = True
+        elif return_code and not last_line and error_tail:
+            last_line = " ".join(error_tail)
+        return handle_error(fail_on_error, last_line, return_code, scan_id, scan_configuration, cancelled)
     except subprocess.CalledProcessError as calledProcessError:
         return handle_error(fail_on_error, calledProcessError.output, calledProcessError.returncode, '', scan_configuration)
 
+def read_stream(stream, is_error_stream, line_queue):
+    for line in io.TextIOWrapper(stream, encoding="utf-8", errors="replace"):
+        line_queue.put((is_error_stream, line))
+    line_queue.put((is_error_stream, None))
+
 def handle_output(process_id, process, output_file, return_line_filter):
     last_line = ""
     scan_id = ""
-    for line in io.TextIOWrapper(process.stdout, encoding="utf-8"):
+    error_tail = deque(maxlen=ERROR_TAIL_SIZE)
+    line_queue = queue.Queue()
+    for stream, is_error_stream in [(process.stdout, False), (process.stderr, True)]:
+        threading.Thread(target=read_stream, args=(stream, is_error_stream, line_queue,), daemon=True).start()
+    open_streams = 2
+    while open_streams:
+        is_error_stream, line = line_queue.get()
+        if line is None:
+            open_streams -= 1
+            continue
         if return_line_filter:
             last_line = last_line if last_line else all_match(line, return_line_filter)
         else:
             last_line = line.strip() if line.strip() else last_line
         print(f"{INFO_PREFIX_COLOUR}{process_id}:{RESET_STYLE} {line}", end='')
-        if output_file:
+        if is_error_stream:
+            if line.strip():
+                error_tail.append(line.strip())
+        elif output_file:
             print(line, file=output_file, end='')
         if line.startswith("Scan ID"):
             scan_id = line.split(" ")[-1].strip()
-    return last_line, scan_id
+    return last_line, scan_id, list(error_tail)
     
 def all_match(line, return_line_filter):
     for filter in return_line_filter:
@@ -57,11 +152,33 @@ def all_match(line, return_line_filter):
 
     return line
 
-def save_sbom_file(sbom_json, scan_configuration):
-    sbom_location = os.path.join(get_absolute_file_path(scan_configuration.base_cli_directory, "scan_results"), f"{scan_configuration.application}-SBOM-{scan_configuration.sbom_type}.json")
-    with open(sbom_location, 'w') as output_file:
-        output_file.write(json.dumps(sbom_json, indent=2))
-    scan_configuration.generated_output_files.append({ FILE_TYPE: f"{scan_configuration.sbom_type} SBOM", FILE_LOCATION: sbom_location})
+def open_sbom_file(sbom_location, scan_configuration):
+    if scan_configuration.sbom_compression == "GZIP":
+        return gzip.open(sbom_location, 'wb')
+    if scan_configuration.sbom_compression == "ZSTD":
+        import zstandard
+        return zstandard.ZstdCompressor().stream_writer(open(sbom_location, 'wb'), closefd=True)
+    return open(sbom_location, 'wb')
+
+def write_sbom(sbom_response, output_file, scan_configuration):
+    if scan_configuration.sbom_pretty:
+        text_file = io.TextIOWrapper(output_file, encoding="utf-8")
+        json.dump(sbom_response.json(), text_file, indent=2)
+        text_file.flush()
+        text_file.detach()
+    else:
+        for chunk in sbom_response.iter_content(SBOM_CHUNK_SIZE):
+            output_file.write(chunk)
+
+def save_sbom_file(sbom_response, scan_configuration, sbom_name=None):
+    sbom_location = os.path.join(get_absolute_file_path(scan_configuration.base_cli_directory, "scan_results"),
+                                 f"{sbom_name or scan_configuration.application}-SBOM-{scan_configuration.sbom_type}.json{SBOM_COMPRESSION_EXTENSIONS.get(scan_configuration.sbom_compression, '')}")
+    try:
+        with open_sbom_file(sbom_location, scan_configuration) as output_file:
+            write_sbom(sbom_response, output_file, scan_configuration)
+    finally:
+        sbom_response.close()
+    add_generated_output_file(scan_configuration, f"{scan_configuration.sbom_type} SBOM{f' ({sbom_name})' if sbom_name else ''}", sbom_location)
 
     print(f"{INFO_PREFIX_COLOUR}Veracode SBOM:{RESET_STYLE} {scan_configuration.sbom_type} SBOM saved to: {sbom_location}")
 
@@ -8,10 +8,75 @@ SCA_URL_MAP = {
     'fedramp': "https://sca-api.veracode.us",
     'global': "https://sca-api.veracode.com",
 }
-TIMEOUT_WAIT = 60
+STATUS_POLL_INITIAL_DELAY = 10
+STATUS_POLL_MAX_DELAY = 300
+BUILD_INFO_NAMESPACE = "https://analysiscenter.veracode.com/schema/4.0/buildinfo"
+SCAN_IN_PROGRESS_STATUSES = ["pre-scan submitted", "submitted to engine", "scan in process", "pending internal review"]
+ERROR_TAIL_SIZE = 20
+PROCESS_TERMINATION_GRACE_PERIOD = 10
+CANCELLED_RETURN_CODE = 1
+TIMED_OUT_RETURN_CODE = 124
 SCAN_IN_PROGRESS_ERROR = "* A scan is in progress. Wait for the current scan to complete and try again"
 
 FILE_TYPE = "file_type"
 FILE_LOCATION = "file_location"
 
-MAX_PIPELINE_SCAN_SIZE_IN_BYTES = 2e+8
\ No newline at end of file
+MAX_PIPELINE_SCAN_SIZE_IN_BYTES = 2e+8
+FALLBACK_SANDBOX_SCAN_TIMEOUT = "60"
+MAX_CONCURRENT_LOOKUPS = 8
+STREAM_POLL_INTERVAL = 2
+MEMORY_PER_PIPELINE_SCAN_IN_BYTES = 2 * 1024 * 1024 * 1024
+
+CACHE_DIRECTORY_NAME = "veracode-start-scan"
+METADATA_CACHE_FILE_NAME = "metadata_cache.json"
+RESULT_CACHE_DIRECTORY_NAME = "pipeline_results"
+PACKAGING_CACHE_DIRECTORY_NAME = "packaging"
+RESULT_CACHE_METADATA_FILE = "entry.json"
+DEFAULT_RESULT_CACHE_SIZE_IN_MB = 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+DEFAULT_METADATA_CACHE_TTL = 60
+CACHED_APPLICATION = "application"
+CACHED_APPLICATION_GUID = "application_guid"
+CACHED_POLICY_NAME = "policy_name"
+CACHED_COLLECTION = "collection"
+CACHED_BUSINESS_UNIT = "business_unit"
+CACHED_TEAM = "team"
+CACHED_WORKSPACE = "workspace"
+
+NATIVE_UPLOAD_MAX_WORKERS = 4
+PRESCAN_TIMEOUT_IN_MINUTES = 60
+RESULTS_READY_STATUS = "results ready"
+PRESCAN_SUCCESS_STATUS = "pre-scan success"
+PRESCAN_FINISHED_STATUSES = [PRESCAN_SUCCESS_STATUS, "pre-scan failed", "no modules defined"]
+DELETABLE_BUILD_STATUSES = ["incomplete", "no modules defined", "failed", "cancel"]
+FAILED_BUILD_STATUSES = ["no modules defined", "failed", "cancel"]
+POLICY_CALCULATING_STATUS = "Calculating..."
+POLICY_NOT_PASSED_STATUS = "Did Not Pass"
+POLICY_NOT_PASSED_RETURN_CODE = 4
+SCAN_STATE_FILE_NAME = "platform_scan_state.json"
+SCA_CACHE_DIRECTORY_NAME = "agent_sca"
+DEFAULT_MAX_PARALLEL_SCA_SCANS = 4
+SCA_PROJECT_PAGE_SIZE = 100
+SCA_MANIFEST_FILE_NAMES = ["pom.xml", "build.gradle", "build.gradle.kts", "settings.gradle", "settings.gradle.kts", "gradle.lockfile", "build.sbt",
+                           "package.json", "package-lock.json", "npm-shrinkwrap.json", "yarn.lock", "pnpm-lock.yaml", "bower.json",
+                           "go.mod", "go.sum", "Gopkg.lock", "glide.lock", "requirements.txt", "setup.py", "setup.cfg", "pyproject.toml", "Pipfile", "Pipfile.lock", "poetry.lock",
+                           "Gemfile", "Gemfile.lock", "composer.json", "composer.lock", "packages.config", "packages.lock.json", "Directory.Packages.props",
+                           "Cargo.toml", "Cargo.lock", "Podfile", "Podfile.lock", "Package.swift", "Package.resolved", "mix.exs", "mix.lock"]
+SCA_MANIFEST_FILE_EXTENSIONS = [".csproj", ".vbproj", ".fsproj"]
+SCA_IGNORED_DIRECTORIES = [".git", ".gradle", ".verascan", "scan_results", "node_modules", "bower_components", "vendor", "target", "build", "dist", "bin", "obj", ".venv", "venv", "__pycache__"]
+
+API_CONNECTION_RETRIES = 3
+API_CONNECTIONS_OPENED = "connections_opened"
+API_REQUESTS_SERVED = "requests_served"
+API_RETRYABLE_STATUS_CODES = [429, 502, 503, 504]
+API_THROTTLED_STATUS_CODE = 429
+API_MAX_RETRIES = 5
+API_RETRY_INITIAL_DELAY = 2
+API_RETRY_MAX_DELAY = 60
+API_RETRY_BUDGET = 10
+API_RETRY_BUDGET_REFILL = 0.1
+STORED_APPLICATION = "application"
+STORED_COLLECTION = "collection"
+STORED_POLICY = "policy"
+SBOM_COMPRESSION_EXTENSIONS = {"GZIP": ".gz", "ZSTD": ".zst"}
+SBOM_CHUNK_SIZE = 1024 * 1024
\ No newline at end of file
@@ -13,8 +13,10 @@ def exit_with_error(message: any, return_value: int, scan_configuration):
 def show_warning(message):
     print(f"{WARNING_MESSAGE_COLOUR}WARNING: {RESET_STYLE}{WARNING_MESSAGE_COLOUR}{message}{RESET_STYLE}")
 
-def try_generate_error_message(return_code, message, target, messages=[]):
-    if return_code != 0:        
+def try_generate_error_message(return_code, message, target, messages=[], cancelled=False):
+    if cancelled:
+        messages.append(f"{WARNING_MESSAGE_COLOUR}Cancelled scan for {target}:{RESET_STYLE} {message}.")
+    elif return_code != 0:        
         messages.append(f"{ERROR_PREFIX_COLOUR}Failed scan for {target}:{RESET_STYLE} {message}.")
     else:
         messages.append(f"{INFO_PREFIX_COLOUR}Successfull scan for {target}:{RESET_STYLE} {message}.")
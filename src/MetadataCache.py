@@ -0,0 +1,91 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import tempfile
+from pathlib import Path
+from veracode_api_py.apihelper import get_region_for_api_credential
+from Constants import CACHE_DIRECTORY_NAME, METADATA_CACHE_FILE_NAME
+from ErrorHandler import show_warning
+
+cache_lock = threading.Lock()
+cache_entries = None
+
+def get_user_cache_directory():
+    base_directory = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA") or os.path.join(Path.home(), ".cache")
+    cache_directory = os.path.join(base_directory, CACHE_DIRECTORY_NAME)
+    Path(cache_directory).mkdir(parents=True, exist_ok=True)
+    return cache_directory
+
+def get_metadata_cache_location():
+    return os.path.join(get_user_cache_directory(), METADATA_CACHE_FILE_NAME)
+
+def read_cache_file():
+    try:
+        with open(get_metadata_cache_location(), 'r') as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+
+def write_cache_file(entries):
+    cache_location = get_metadata_cache_location()
+    try:
+        file_descriptor, temporary_location = tempfile.mkstemp(dir=os.path.dirname(cache_location), suffix=".tmp")
+        with os.fdopen(file_descriptor, 'w') as cache_file:
+            json.dump(entries, cache_file)
+        os.replace(temporary_location, cache_location)
+    except OSError as e:
+        show_warning(f"Unable to save metadata cache: {e}")
+
+def get_cache_entries():
+    global cache_entries
+    if cache_entries is None:
+        cache_entries = read_cache_file()
+    return cache_entries
+
+def get_cache_key(object_type, object_name, scan_configuration):
+    credential_hash = hashlib.sha256(scan_configuration.vid.encode("utf-8")).hexdigest()[:16]
+    return f"{get_region_for_api_credential(scan_configuration.vid)}|{credential_hash}|{object_type}|{str(object_name).strip()}"
+
+def is_cacheable(value):
+    if isinstance(value, (list, tuple)):
+        return any(value)
+    return bool(value)
+
+def get_cached_value(object_type, object_name, scan_configuration):
+    cache_key = get_cache_key(object_type, object_name, scan_configuration)
+    with cache_lock:
+        entry = get_cache_entries().get(cache_key)
+    if entry and time.time() - entry["timestamp"] < scan_configuration.metadata_cache_ttl * 60:
+        return True, entry["value"]
+    return False, None
+
+def set_cached_value(object_type, object_name, value, scan_configuration):
+    cache_key = get_cache_key(object_type, object_name, scan_configuration)
+    with cache_lock:
+        entries = read_cache_file()
+        entries[cache_key] = {"timestamp": time.time(), "value": value}
+        get_cache_entries().update(entries)
+        write_cache_file(entries)
+
+def invalidate_cached_value(object_type, object_name, scan_configuration):
+    if not scan_configuration.metadata_cache or not object_name:
+        return
+    cache_key = get_cache_key(object_type, object_name, scan_configuration)
+    with cache_lock:
+        entries = read_cache_file()
+        entries.pop(cache_key, None)
+        get_cache_entries().pop(cache_key, None)
+        write_cache_file(entries)
+
+def run_cached(object_type, object_name, function_to_run, scan_configuration):
+    if not scan_configuration.metadata_cache:
+        return function_to_run(object_name)
+    is_hit, value = get_cached_value(object_type, object_name, scan_configuration)
+    if is_hit:
+        return value
+    value = function_to_run(object_name)
+    if is_cacheable(value):
+        set_cached_value(object_type, object_name, value, scan_configuration)
+    return value
\ No newline at end of file
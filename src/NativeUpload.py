@@ -0,0 +1,163 @@
+import os
+import re
+import time
+import random
+import xml.etree.ElementTree as ElementTree
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from veracode_api_py.apihelper import APIHelper
+from veracode_api_py.exceptions import VeracodeAPIError
+from ScanConfiguration import ScanConfiguration
+from VeracodeApi import run_with_retries, get_sandbox_id, get_build, get_build_status
+from ColourHandler import INFO_PREFIX_COLOUR, RESET_STYLE
+from Constants import SCAN_IN_PROGRESS_ERROR, SCAN_IN_PROGRESS_STATUSES, STATUS_POLL_INITIAL_DELAY, STATUS_POLL_MAX_DELAY, NATIVE_UPLOAD_MAX_WORKERS, PRESCAN_TIMEOUT_IN_MINUTES
+from Constants import RESULTS_READY_STATUS, PRESCAN_SUCCESS_STATUS, PRESCAN_FINISHED_STATUSES, DELETABLE_BUILD_STATUSES
+
+def get_xml_api_url(endpoint):
+    return f"{APIHelper().baseurl.rstrip('/')}/5.0/{endpoint}"
+
+def get_tag_name(element):
+    return element.tag.rsplit("}", 1)[-1]
+
+def find_elements(root, tag_name):
+    return [element for element in root.iter() if get_tag_name(element) == tag_name]
+
+def send_xml_request(request):
+    url, method, params, files = request
+    for _, file_to_upload in (files or {}).values():
+        file_to_upload.seek(0)
+    return APIHelper()._xml_request(url, method, params=params, files=files)
+
+def call_xml_api(endpoint, method, params, files=None):
+    response = ElementTree.fromstring(run_with_retries(send_xml_request, (get_xml_api_url(endpoint), method, params, files), idempotent=method == "GET"))
+    if get_tag_name(response) == "error":
+        raise VeracodeAPIError(f"{endpoint}: {response.text}")
+    return response
+
+def get_build_parameters(scan_configuration: ScanConfiguration, sandbox_id, additional_parameters={}):
+    parameters = {"app_id": scan_configuration.application_legacy_id}
+    if sandbox_id:
+        parameters["sandbox_id"] = sandbox_id
+    parameters.update(additional_parameters)
+    return parameters
+
+def print_progress(scan_type_prefix, message):
+    print(f"{INFO_PREFIX_COLOUR}{scan_type_prefix}:{RESET_STYLE} {message}")
+
+def get_or_create_sandbox_id(scan_configuration: ScanConfiguration, scan_type_prefix):
+    sandbox_id = get_sandbox_id(scan_configuration)
+    if sandbox_id:
+        return sandbox_id
+    print_progress(scan_type_prefix, f"Creating sandbox {scan_configuration.sandbox_name}")
+    sandbox_info = call_xml_api("createsandbox.do", "POST", get_build_parameters(scan_configuration, None, {"sandbox_name": scan_configuration.sandbox_name}))
+    return find_elements(sandbox_info, "sandbox")[0].get("sandbox_id")
+
+def can_delete_build(build_status, delete_incomplete_scan):
+    if delete_incomplete_scan == "2":
+        return True
+    if delete_incomplete_scan == "1":
+        return any(deletable_status in build_status for deletable_status in DELETABLE_BUILD_STATUSES)
+    return False
+
+def prepare_build(scan_configuration: ScanConfiguration, sandbox_id, scan_type_prefix):
+    build = get_build(scan_configuration, sandbox_id)
+    build_status = get_build_status(build) if build is not None else RESULTS_READY_STATUS
+    if build_status == RESULTS_READY_STATUS:
+        return None
+    if can_delete_build(build_status, scan_configuration.delete_incomplete_scan):
+        print_progress(scan_type_prefix, f"Deleting previous scan with status '{build_status}'")
+        call_xml_api("deletebuild.do", "GET", get_build_parameters(scan_configuration, sandbox_id))
+        return None
+    if build_status in SCAN_IN_PROGRESS_STATUSES:
+        return SCAN_IN_PROGRESS_ERROR
+    return f"The previous scan was not completed (status: '{build_status}'), use --delete_incomplete_scan to delete it"
+
+def create_build(scan_configuration: ScanConfiguration, sandbox_id):
+    build_info = call_xml_api("createbuild.do", "POST", get_build_parameters(scan_configuration, sandbox_id, {"version": scan_configuration.version}))
+    return find_elements(build_info, "build")[0].get("build_id")
+
+def get_files_to_upload(source):
+    if os.path.isfile(source):
+        return [source]
+    files_to_upload = []
+    for directory, _, file_names in os.walk(source):
+        files_to_upload.extend(map(lambda file_name: os.path.join(directory, file_name), file_names))
+    return sorted(files_to_upload)
+
+def upload_file(scan_configuration: ScanConfiguration, sandbox_id, file_location):
+    with open(file_location, 'rb') as file_to_upload:
+        call_xml_api("uploadfile.do", "POST", get_build_parameters(scan_configuration, sandbox_id),
+                     files={"file": (os.path.basename(file_location), file_to_upload)})
+    return os.path.basename(file_location)
+
+def upload_all_files(scan_configuration: ScanConfiguration, sandbox_id, scan_type_prefix):
+    files_to_upload = get_files_to_upload(scan_configuration.source)
+    if not files_to_upload:
+        raise VeracodeAPIError(f"No files found to upload in {scan_configuration.source}")
+    with ThreadPoolExecutor(max_workers=min(NATIVE_UPLOAD_MAX_WORKERS, len(files_to_upload))) as executor:
+        uploads = [executor.submit(upload_file, scan_configuration, sandbox_id, file_location) for file_location in files_to_upload]
+        for upload in as_completed(uploads):
+            print_progress(scan_type_prefix, f"Uploaded {upload.result()}")
+
+def wait_for_build(scan_configuration: ScanConfiguration, sandbox_id, build_id, is_finished, deadline=None):
+    poll_delay = STATUS_POLL_INITIAL_DELAY
+    while True:
+        build = get_build(scan_configuration, sandbox_id, build_id)
+        if build is not None and is_finished(build):
+            return build
+        if deadline and datetime.now() >= deadline:
+            return None
+        sleep_time = random.uniform(poll_delay / 2, poll_delay)
+        time.sleep(max(0, min(sleep_time, (deadline - datetime.now()).total_seconds())) if deadline else sleep_time)
+        poll_delay = min(poll_delay * 2, STATUS_POLL_MAX_DELAY)
+
+def get_module_name_pattern(pattern):
+    return re.compile("".join(".*" if character == "*" else "." if character == "?" else re.escape(character) for character in pattern.strip()), re.DOTALL)
+
+def matches_any_pattern(module_name, patterns):
+    return any(get_module_name_pattern(pattern).fullmatch(module_name) for pattern in patterns.split(",") if pattern.strip())
+
+def is_selected_module(module, scan_configuration: ScanConfiguration):
+    if module.get("has_fatal_errors") == "true" or module.get("is_dependency") == "true":
+        return False
+    if scan_configuration.include and not matches_any_pattern(module.get("name", ""), scan_configuration.include):
+        return False
+    return not (scan_configuration.exclude and matches_any_pattern(module.get("name", ""), scan_configuration.exclude))
+
+def start_scan(scan_configuration: ScanConfiguration, sandbox_id, build_id, scan_type_prefix):
+    if not scan_configuration.include and not scan_configuration.exclude:
+        call_xml_api("beginprescan.do", "POST", get_build_parameters(scan_configuration, sandbox_id,
+                     {"auto_scan": "true", "scan_all_nonfatal_top_level_modules": "true" if scan_configuration.scan_all_non_fatal_top_level_modules else "false"}))
+        return
+    call_xml_api("beginprescan.do", "POST", get_build_parameters(scan_configuration, sandbox_id, {"auto_scan": "false"}))
+    prescan_timeout = int(scan_configuration.scan_timeout or 0) or PRESCAN_TIMEOUT_IN_MINUTES
+    print_progress(scan_type_prefix, f"Waiting up to {prescan_timeout} minutes for the pre-scan to select the modules to scan")
+    build = wait_for_build(scan_configuration, sandbox_id, build_id, lambda build: get_build_status(build) in PRESCAN_FINISHED_STATUSES,
+                           datetime.now() + timedelta(minutes=prescan_timeout))
+    if build is None:
+        raise VeracodeAPIError(f"The pre-scan of build {build_id} did not finish within {prescan_timeout} minutes")
+    build_status = get_build_status(build)
+    if build_status != PRESCAN_SUCCESS_STATUS:
+        raise VeracodeAPIError(f"Pre-scan finished with status '{build_status}'")
+    prescan_results = call_xml_api("getprescanresults.do", "GET", get_build_parameters(scan_configuration, sandbox_id, {"build_id": build_id}))
+    selected_modules = [module for module in find_elements(prescan_results, "module") if is_selected_module(module, scan_configuration)]
+    if not selected_modules:
+        raise VeracodeAPIError("No modules left to scan after applying --include and --exclude")
+    print_progress(scan_type_prefix, f"Scanning modules: {', '.join(map(lambda module: module.get('name', ''), selected_modules))}")
+    call_xml_api("beginscan.do", "POST", get_build_parameters(scan_configuration, sandbox_id, {"modules": ",".join(map(lambda module: module.get("id"), selected_modules))}))
+
+def run_native_scan(scan_configuration: ScanConfiguration, scan_type_prefix):
+    build_id = ''
+    try:
+        sandbox_id = get_or_create_sandbox_id(scan_configuration, scan_type_prefix) if scan_configuration.sandbox_name else None
+        build_error = prepare_build(scan_configuration, sandbox_id, scan_type_prefix)
+        if build_error:
+            print_progress(scan_type_prefix, build_error)
+            return 1, build_error, ''
+        build_id = create_build(scan_configuration, sandbox_id)
+        print_progress(scan_type_prefix, f"Created scan {scan_configuration.version} (build {build_id})")
+        upload_all_files(scan_configuration, sandbox_id, scan_type_prefix)
+        start_scan(scan_configuration, sandbox_id, build_id, scan_type_prefix)
+        return 0, "The scan was submitted", build_id
+    except Exception as e:
+        return 1, str(e), build_id
@@ -0,0 +1,92 @@
+import os
+import json
+import hashlib
+import subprocess
+from pathlib import Path
+from MetadataCache import get_user_cache_directory
+from ResultCache import get_file_hash
+from Constants import PACKAGING_CACHE_DIRECTORY_NAME, SCA_IGNORED_DIRECTORIES
+from ErrorHandler import show_warning
+
+def get_packaging_manifest_location(scan_source, scan_configuration):
+    manifest_name = hashlib.sha256(f"{scan_configuration.application}|{os.path.abspath(scan_source)}".encode("utf-8")).hexdigest()
+    manifest_directory = os.path.join(get_user_cache_directory(), PACKAGING_CACHE_DIRECTORY_NAME)
+    Path(manifest_directory).mkdir(parents=True, exist_ok=True)
+    return os.path.join(manifest_directory, f"{manifest_name}.json")
+
+def read_packaging_manifest(manifest_location):
+    try:
+        with open(manifest_location, 'r') as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+
+def save_packaging_manifest(manifest_location, fingerprint, file_hashes):
+    try:
+        with open(manifest_location, 'w') as manifest_file:
+            json.dump({"fingerprint": fingerprint, "files": file_hashes}, manifest_file)
+    except OSError as e:
+        show_warning(f"Unable to save packaging cache: {e}")
+
+def is_ignored_path(relative_path):
+    return any(part in SCA_IGNORED_DIRECTORIES for part in Path(relative_path).parts)
+
+def run_git(scan_source, arguments):
+    return subprocess.run(["git", "-C", scan_source] + arguments, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True).stdout
+
+def get_git_changed_files(scan_source):
+    git_root = run_git(scan_source, ["rev-parse", "--show-toplevel"]).decode("utf-8").strip()
+    status = run_git(scan_source, ["status", "--porcelain=v1", "-z", "--untracked-files=all", "--", "."]).decode("utf-8")
+    changed_files = []
+    entries = iter(status.split("\0"))
+    for entry in entries:
+        if not entry:
+            continue
+        if entry[0] in "RC":
+            next(entries, None)
+        changed_files.append(os.path.join(git_root, entry[3:]))
+    return changed_files
+
+def get_walked_files(scan_source):
+    walked_files = []
+    for directory, directories, files in os.walk(scan_source):
+        directories[:] = [child for child in directories if child not in SCA_IGNORED_DIRECTORIES]
+        walked_files.extend(map(lambda file_name: os.path.join(directory, file_name), files))
+    return walked_files
+
+def hash_files(files_to_hash, scan_source, previous_file_hashes):
+    file_hashes = {}
+    for file_location in files_to_hash:
+        relative_path = os.path.relpath(file_location, scan_source)
+        if is_ignored_path(relative_path):
+            continue
+        try:
+            file_stat = os.stat(file_location)
+        except OSError:
+            file_hashes[relative_path] = None
+            continue
+        previous_hash = previous_file_hashes.get(relative_path)
+        if previous_hash and previous_hash[0] == file_stat.st_mtime_ns and previous_hash[1] == file_stat.st_size:
+            file_hashes[relative_path] = previous_hash
+        else:
+            file_hashes[relative_path] = [file_stat.st_mtime_ns, file_stat.st_size, get_file_hash(file_location)]
+    return file_hashes
+
+def get_source_fingerprint(scan_source, previous_file_hashes, scan_configuration):
+    tree_hash = ""
+    if scan_configuration.has_git_folder(scan_configuration.get_git_root(scan_source)):
+        try:
+            tree_hash = run_git(scan_source, ["rev-parse", "HEAD:./"]).decode("utf-8").strip()
+            files_to_hash = get_git_changed_files(scan_source)
+        except (OSError, subprocess.CalledProcessError):
+            tree_hash = ""
+    if not tree_hash:
+        files_to_hash = get_walked_files(scan_source)
+    file_hashes = hash_files(files_to_hash, scan_source, previous_file_hashes)
+    fingerprint = hashlib.sha256(tree_hash.encode("utf-8"))
+    for relative_path in sorted(file_hashes):
+        fingerprint.update(f"{relative_path}|{file_hashes[relative_path][2] if file_hashes[relative_path] else 'deleted'}".encode("utf-8"))
+    return fingerprint.hexdigest(), file_hashes
+
+def has_artifacts(artifacts_directory):
+    return os.path.isdir(artifacts_directory) and bool(os.listdir(artifacts_directory))
\ No newline at end of file
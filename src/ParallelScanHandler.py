@@ -1,14 +1,32 @@
+import threading
 from ScanConfiguration import ScanConfiguration
 from ErrorHandler import exit_with_error, try_generate_error_message
 from ColourHandler import INFO_PREFIX_COLOUR, ERROR_PREFIX_COLOUR, RESET_STYLE
 from Constants import FILE_TYPE, FILE_LOCATION
 
+results_lock = threading.Lock()
+
+def store_result(returned_values, target, returned_value):
+    with results_lock:
+        returned_values[target] = returned_value
+
+def is_cancelled(returned_value):
+    return len(returned_value) > 3 and returned_value[3]
+
+def add_generated_output_file(scan_configuration: ScanConfiguration, file_type, file_location):
+    with results_lock:
+        scan_configuration.generated_output_files.append({ FILE_TYPE: file_type, FILE_LOCATION: file_location})
+
 def parse_all_results(scan_configuration: ScanConfiguration, returned_values):
     total_return_code = 0
     messages = []
     for target, returned_value in returned_values.items():
-        total_return_code += abs(returned_value[0])
-        messages=try_generate_error_message(return_code=returned_value[0], message=returned_value[1], target=target)
+        if not is_cancelled(returned_value):
+            total_return_code += abs(returned_value[0])
+        messages=try_generate_error_message(return_code=returned_value[0], message=returned_value[1], target=target, cancelled=is_cancelled(returned_value))
+
+    if scan_configuration.fallback_artifacts:
+        messages.append(f"{INFO_PREFIX_COLOUR}Scanned in Sandbox '{scan_configuration.fallback_sandbox}':{RESET_STYLE} {', '.join(scan_configuration.fallback_artifacts)}")
 
     if scan_configuration.generated_output_files:
         messages.append(f"{INFO_PREFIX_COLOUR}Output files:{RESET_STYLE}")
@@ -1,22 +1,40 @@
 import os
+import copy
+import shutil
 import threading
 import datetime
 
 from pathlib import Path
 from ScanConfiguration import ScanConfiguration
-from CliCaller import call_subprocess, get_absolute_file_path
+from CliCaller import call_subprocess, get_absolute_file_path, cancel_all_processes
 from ScanConfiguration import ScanConfiguration
-from VeracodeCli import get_policy_file_name
-from ParallelScanHandler import parse_all_results
-from VeracodeApi import expire_srcclr_token
-from AgentScanner import run_agent_sca
+from VeracodeCli import get_policy_file_name, get_artifacts_directory
+from PlatformScan import start_platform_scan_inner
 from ErrorHandler import exit_with_error
-from Constants import FILE_TYPE, FILE_LOCATION, MAX_PIPELINE_SCAN_SIZE_IN_BYTES
-from ColourHandler import WARNING_COLOUR, RESET_STYLE
+from ParallelScanHandler import store_result, add_generated_output_file, is_cancelled
+from Constants import MAX_PIPELINE_SCAN_SIZE_IN_BYTES, STREAM_POLL_INTERVAL, FALLBACK_SANDBOX_SCAN_TIMEOUT
+from ColourHandler import WARNING_COLOUR, INFO_PREFIX_COLOUR, RESET_STYLE
+from ScanScheduler import ScanScheduler
+from ResultCache import get_result_cache_key, get_cached_result, save_result, remove_previous_results
 
-def run_pipeline_scan_thread(returned_values, scan_target, scan_configuration : ScanConfiguration, policy_file_name, results_json, results_txt):
+def add_pipeline_scan_output_files(scan_configuration: ScanConfiguration, scan_target, results_json, results_txt):
+    add_generated_output_file(scan_configuration, f"Pipeline scan results JSON for {scan_target}", results_json)
+    add_generated_output_file(scan_configuration, f"Pipeline scan results TXT for {scan_target}", results_txt)
+
+def run_pipeline_scan_thread(returned_values, scan_target, scan_configuration : ScanConfiguration, policy_file_name, results_json, results_txt, artifacts_directory):
+    cache_key = None
+    if scan_configuration.result_cache and os.path.isfile(os.path.join(artifacts_directory, scan_target)):
+        cache_key = get_result_cache_key(os.path.join(artifacts_directory, scan_target), policy_file_name, scan_configuration.include)
+        cached_result = get_cached_result(cache_key, results_json, results_txt)
+        if cached_result:
+            print(f"{INFO_PREFIX_COLOUR}Scanning {scan_target}:{RESET_STYLE} artifact unchanged since last scan, using cached results.")
+            store_result(returned_values, scan_target, cached_result)
+            add_pipeline_scan_output_files(scan_configuration, scan_target, results_json, results_txt)
+            return
+
+    remove_previous_results(results_json, results_txt)
     commands = [scan_configuration.veracode_cli_location, "static", "scan", 
-                                            os.path.join(scan_configuration.source, scan_target), 
+                                            os.path.join(artifacts_directory, scan_target), 
                                             "--project-name", scan_configuration.application,
                                             "--app-id", scan_configuration.application_guid,
                                             "--policy-file", policy_file_name, 
@@ -28,52 +46,147 @@ def run_pipeline_scan_thread(returned_values, scan_target, scan_configuration :
     if scan_configuration.include:
         commands.append("--include")
         commands.append(scan_configuration.include)
-    returned_values[scan_target] = call_subprocess(process_id=f"Scanning {scan_target}", scan_configuration=scan_configuration, fail_on_error=False, commands=commands)
-    scan_configuration.generated_output_files.append({ FILE_TYPE: f"Pipeline scan results JSON for {scan_target}", FILE_LOCATION: results_json})
-    scan_configuration.generated_output_files.append({ FILE_TYPE: f"Pipeline scan results TXT for {scan_target}", FILE_LOCATION: results_txt})
+    returned_value = call_subprocess(process_id=f"Scanning {scan_target}", scan_configuration=scan_configuration, fail_on_error=False, commands=commands)
+    store_result(returned_values, scan_target, returned_value)
+    if scan_configuration.fail_fast and returned_value[0] and not is_cancelled(returned_value):
+        print(f"{WARNING_COLOUR}WARNING{RESET_STYLE}: {scan_target} failed and --fail_fast is set, cancelling the remaining scans.")
+        cancel_all_processes()
+    if is_cancelled(returned_value):
+        return
+    if cache_key:
+        save_result(cache_key, returned_value, results_json, results_txt, scan_configuration.result_cache_size * 1024 * 1024)
+    add_pipeline_scan_output_files(scan_configuration, scan_target, results_json, results_txt)
+
+def store_pipeline_scan_error(returned_values, scan_target, scan_configuration: ScanConfiguration, error):
+    store_result(returned_values, scan_target, (1, f"Scan stopped by an unexpected error: {str(error) or type(error).__name__}", ''))
+    if scan_configuration.fail_fast:
+        print(f"{WARNING_COLOUR}WARNING{RESET_STYLE}: {scan_target} failed and --fail_fast is set, cancelling the remaining scans.")
+        cancel_all_processes()
+
+def submit_pipeline_scan(scheduler: ScanScheduler, scan_configuration, artifacts_directory, scan_target, artifact_size, policy_file_name, returned_values, base_results_location):
+    folder_to_save = os.path.join(base_results_location, scan_target.replace(".", ""))
+    Path(folder_to_save).mkdir(parents=True, exist_ok=True)
+    scheduler.submit(lambda: run_pipeline_scan_thread(returned_values, scan_target, scan_configuration, 
+                                                      policy_file_name, os.path.join(folder_to_save, "results.json"), 
+                                                      os.path.join(folder_to_save, "results.txt"), artifacts_directory), artifact_size,
+                     lambda error: store_pipeline_scan_error(returned_values, scan_target, scan_configuration, error))
+
+def get_artifact_sizes(artifacts_directory):
+    return {scan_target: Path(os.path.join(artifacts_directory, scan_target)).stat().st_size for scan_target in os.listdir(artifacts_directory)}
 
-def start_all_pipeline_scans(scan_configuration, policy_file_name, returned_values, threads, base_results_location):
+def start_all_pipeline_scans(scan_configuration, policy_file_name, returned_values, scheduler, base_results_location):
     Path(base_results_location).mkdir(parents=True, exist_ok=True)
-    for scan_target in os.listdir(get_absolute_file_path(scan_configuration.base_cli_directory, scan_configuration.source)):
-        folder_to_save = os.path.join(base_results_location, scan_target.replace(".", ""))
-        Path(folder_to_save).mkdir(parents=True, exist_ok=True)
-        thread = threading.Thread(target=run_pipeline_scan_thread, args=(returned_values, scan_target, scan_configuration, 
-                                                                         policy_file_name, os.path.join(folder_to_save, "results.json"), 
-                                                                         os.path.join(folder_to_save, "results.txt"),))
-        thread.start()
-        threads.append(thread)
-
-def start_pipeline_scan(scan_configuration: ScanConfiguration):
+    artifacts_directory = get_absolute_file_path(scan_configuration.base_cli_directory, scan_configuration.source)
+    for scan_target, artifact_size in get_artifact_sizes(artifacts_directory).items():
+        if scan_target in scan_configuration.fallback_artifacts:
+            continue
+        submit_pipeline_scan(scheduler, scan_configuration, artifacts_directory, scan_target, artifact_size, policy_file_name, returned_values, base_results_location)
+
+def start_pipeline_scan(scan_configuration: ScanConfiguration, returned_values):
     policy_file_name = get_policy_file_name(scan_configuration)
-    returned_values = {}
-    threads = []
+    scheduler = ScanScheduler(scan_configuration.max_parallel_scans)
     base_results_location = get_absolute_file_path(scan_configuration.base_cli_directory, "scan_results")
-    start_all_pipeline_scans(scan_configuration, policy_file_name, returned_values, threads, base_results_location)
-    
+    fallback_thread = None
+    try:
+        if scan_configuration.fallback_artifacts:
+            artifacts_directory = get_absolute_file_path(scan_configuration.base_cli_directory, scan_configuration.source)
+            fallback_thread = threading.Thread(target=start_fallback_sandbox_scan, args=(scan_configuration, returned_values, artifacts_directory, list(scan_configuration.fallback_artifacts),))
+            fallback_thread.start()
+        start_all_pipeline_scans(scan_configuration, policy_file_name, returned_values, scheduler, base_results_location)
+    finally:
+        scheduler.join()
+        if fallback_thread:
+            fallback_thread.join()
+
+def get_fallback_staging_directory(scan_configuration: ScanConfiguration):
+    return f"{get_artifacts_directory(scan_configuration)}-fallback-sandbox"
+
+def stage_fallback_artifacts(staging_directory, artifacts_directory, fallback_artifacts):
+    shutil.rmtree(staging_directory, ignore_errors=True)
+    Path(staging_directory).mkdir(parents=True, exist_ok=True)
+    for scan_target in fallback_artifacts:
+        try:
+            os.link(os.path.join(artifacts_directory, scan_target), os.path.join(staging_directory, scan_target))
+        except OSError:
+            shutil.copy2(os.path.join(artifacts_directory, scan_target), os.path.join(staging_directory, scan_target))
+
+def start_fallback_sandbox_scan(scan_configuration: ScanConfiguration, returned_values, artifacts_directory, fallback_artifacts):
+    staging_directory = get_fallback_staging_directory(scan_configuration)
+    fallback_configuration = copy.copy(scan_configuration)
+    fallback_configuration.pipeline_scan = False
+    fallback_configuration.source = staging_directory
+    fallback_configuration.sandbox_name = scan_configuration.fallback_sandbox
+    fallback_configuration.version = '{:%Y-%m-%d %H:%M:%S}'.format(datetime.datetime.now())
+    fallback_configuration.scan_timeout = FALLBACK_SANDBOX_SCAN_TIMEOUT
+    print(f"{WARNING_COLOUR}WARNING{RESET_STYLE}: {', '.join(fallback_artifacts)} exceeded the 200MB pipeline scan limit. Scanning them in Sandbox '{scan_configuration.fallback_sandbox}'")
     try:
-        if scan_configuration.srcclr_token:
-            thread = threading.Thread(target=run_agent_sca, args=(returned_values, os.path.join(base_results_location, "sca_results.txt"), scan_configuration,))
-            thread.start()
-            threads.append(thread)
-        
-        
-        for thread in threads:
-            thread.join()
+        stage_fallback_artifacts(staging_directory, artifacts_directory, fallback_artifacts)
+        start_platform_scan_inner(fallback_configuration, returned_values)
+    except (Exception, SystemExit) as e:
+        store_result(returned_values, "Sandbox Scan", (1, f"Scan of {', '.join(fallback_artifacts)} stopped by an unexpected error: {str(e) or type(e).__name__}", ''))
     finally:
-        if scan_configuration.srcclr_token:
-            expire_srcclr_token(scan_configuration)
+        shutil.rmtree(staging_directory, ignore_errors=True)
+
+def is_stable_artifact(artifact_stat, previous_signatures, scan_target, packaging_start_time):
+    if artifact_stat.st_mtime < packaging_start_time:
+        return False
+    signature = (artifact_stat.st_size, artifact_stat.st_mtime)
+    if previous_signatures.get(scan_target) != signature:
+        previous_signatures[scan_target] = signature
+        return False
+    return True
 
-    parse_all_results(scan_configuration, returned_values)
+def stream_pipeline_scans(scan_configuration: ScanConfiguration, returned_values, packaging_finished: threading.Event, packaging_succeeded: threading.Event, packaging_start_time):
+    policy_file_name = get_policy_file_name(scan_configuration)
+    scheduler = ScanScheduler(scan_configuration.max_parallel_scans)
+    try:
+        stream_pipeline_scans_to_scheduler(scan_configuration, returned_values, scheduler, policy_file_name, packaging_finished, packaging_succeeded, packaging_start_time)
+    finally:
+        scheduler.join()
+
+def stream_pipeline_scans_to_scheduler(scan_configuration: ScanConfiguration, returned_values, scheduler: ScanScheduler, policy_file_name, packaging_finished: threading.Event, packaging_succeeded: threading.Event, packaging_start_time):
+    base_results_location = get_absolute_file_path(scan_configuration.base_cli_directory, "scan_results")
+    Path(base_results_location).mkdir(parents=True, exist_ok=True)
+    artifacts_directory = get_artifacts_directory(scan_configuration)
+    ignored_artifacts = scan_configuration.ignore_artifacts or []
+    previous_signatures = {}
+    dispatched_artifacts = set()
+    while True:
+        is_final_sweep = packaging_finished.is_set()
+        if is_final_sweep and not packaging_succeeded.is_set():
+            break
+        for scan_target in (os.listdir(artifacts_directory) if os.path.isdir(artifacts_directory) else []):
+            artifact_location = os.path.join(artifacts_directory, scan_target)
+            if scan_target in dispatched_artifacts or scan_target in ignored_artifacts or not os.path.isfile(artifact_location):
+                continue
+            artifact_stat = Path(artifact_location).stat()
+            if not is_final_sweep and not is_stable_artifact(artifact_stat, previous_signatures, scan_target, packaging_start_time):
+                continue
+            dispatched_artifacts.add(scan_target)
+            if artifact_stat.st_size > MAX_PIPELINE_SCAN_SIZE_IN_BYTES:
+                if not scan_configuration.hybrid_scan:
+                    exit_with_error(f"{scan_target} is larger than the 200MB pipeline scan limit.", -1, scan_configuration)
+                scan_configuration.fallback_artifacts.append(scan_target)
+                continue
+            print(f"Artifact ready, starting pipeline scan: {scan_target}")
+            submit_pipeline_scan(scheduler, scan_configuration, artifacts_directory, scan_target, artifact_stat.st_size, policy_file_name, returned_values, base_results_location)
+        if is_final_sweep:
+            break
+        packaging_finished.wait(STREAM_POLL_INTERVAL)
 
+    if scan_configuration.fallback_artifacts:
+        start_fallback_sandbox_scan(scan_configuration, returned_values, artifacts_directory, scan_configuration.fallback_artifacts)
 
 def validate_pipeline_scan_artifacts(scan_configuration: ScanConfiguration):
-    for scan_target in os.listdir(get_absolute_file_path(scan_configuration.base_cli_directory, scan_configuration.source)):
-        if Path(os.path.join(scan_configuration.source, scan_target)).stat().st_size > MAX_PIPELINE_SCAN_SIZE_IN_BYTES:
-            if scan_configuration.fallback_sandbox:
+    for scan_target, artifact_size in get_artifact_sizes(get_absolute_file_path(scan_configuration.base_cli_directory, scan_configuration.source)).items():
+        if artifact_size > MAX_PIPELINE_SCAN_SIZE_IN_BYTES:
+            if scan_configuration.hybrid_scan:
+                scan_configuration.fallback_artifacts.append(scan_target)
+            elif scan_configuration.fallback_sandbox:
                 scan_configuration.pipeline_scan = False
                 scan_configuration.sandbox_name = scan_configuration.fallback_sandbox
                 scan_configuration.version = '{:%Y-%m-%d %H:%M:%S}'.format(datetime.datetime.now())
-                scan_configuration.scan_timeout = 60
+                scan_configuration.scan_timeout = FALLBACK_SANDBOX_SCAN_TIMEOUT
                 print(f"{WARNING_COLOUR}WARNING{RESET_STYLE}: {scan_target} is larger than the 200MB pipeline scan limit. Falling back to Sandbox '{scan_configuration.fallback_sandbox}'")
                 return
             else:
@@ -1,75 +1,59 @@
 import time
-import threading
-import os
-from Constants import TIMEOUT_WAIT, SCAN_IN_PROGRESS_ERROR
+import random
+from Constants import SCAN_IN_PROGRESS_ERROR, STATUS_POLL_INITIAL_DELAY, STATUS_POLL_MAX_DELAY
 from datetime import datetime, timedelta
 from ScanConfiguration import ScanConfiguration
-from CliCaller import call_subprocess, save_sbom_file, get_absolute_file_path
-from VeracodeApi import expire_srcclr_token, get_upload_sbom
-from AgentScanner import run_agent_sca
-from ParallelScanHandler import parse_all_results
+from CliCaller import call_subprocess
+from VeracodeApi import is_build_in_progress
+from NativeUpload import run_native_scan
+from ResultPoller import collect_scan_results
+from ParallelScanHandler import store_result
 
 def has_failed_due_to_concurrent_scan(return_message):
     return return_message and SCAN_IN_PROGRESS_ERROR in return_message
 
-def run_scan(scan_configuration : ScanConfiguration, scan_command, timeout, start_time=None):
-    scan_type_prefix = f"{'Sandbox' if scan_configuration.sandbox_name else 'Policy'} Scan"
-    returned_value = call_subprocess(scan_type_prefix, scan_configuration=scan_configuration, fail_on_error=False, commands=scan_command)
-    
-    if returned_value[0] and scan_configuration.wait_for_timeout and has_failed_due_to_concurrent_scan(returned_value[1]):
-        if not start_time:
-            start_time = datetime.now()
-            time_since = timedelta(seconds=0)
-        else:
-            time_since = datetime.now() - start_time
-        if timeout > time_since:
-            print(f"{scan_type_prefix} already running, retrying in {TIMEOUT_WAIT} seconds.")
-            time.sleep(TIMEOUT_WAIT)
-            print(" - Retrying now.")
-            return run_scan(scan_configuration, scan_command, timeout, start_time)
-        else:
-            print(f"ERROR: {scan_type_prefix} still running after {scan_configuration.wait_for_timeout} minutes.")
-
-    return returned_value
+def wait_for_previous_scan(scan_configuration : ScanConfiguration, scan_type_prefix, deadline, poll_delay):
+    print(f"{scan_type_prefix} already running, waiting for it to complete.")
+    while datetime.now() < deadline:
+        remaining_seconds = (deadline - datetime.now()).total_seconds()
+        time.sleep(max(0, min(remaining_seconds, random.uniform(poll_delay / 2, poll_delay))))
+        poll_delay = min(poll_delay * 2, STATUS_POLL_MAX_DELAY)
+        if not is_build_in_progress(scan_configuration):
+            return True, poll_delay
+    return False, poll_delay
 
-def start_platform_scan(scan_configuration: ScanConfiguration):
-    returned_values = {}
-    threads = []
-    base_results_location = get_absolute_file_path(scan_configuration.base_cli_directory, "scan_results")
+def launch_scan(scan_configuration : ScanConfiguration, scan_command, scan_type_prefix):
+    if scan_configuration.native_upload:
+        return run_native_scan(scan_configuration, scan_type_prefix)
+    return call_subprocess(scan_type_prefix, scan_configuration=scan_configuration, fail_on_error=False, commands=scan_command)
 
-    thread = threading.Thread(target=start_platform_scan_inner, args=(scan_configuration, returned_values,))
-    thread.start()
-    threads.append(thread)
-
-    try:
-        if scan_configuration.srcclr_token:
-            thread = threading.Thread(target=run_agent_sca, args=(returned_values, os.path.join(base_results_location, "sca_results.txt"), scan_configuration,))
-            thread.start()
-            threads.append(thread)
-        
-        
-        for thread in threads:
-            thread.join()
-    finally:
-        if scan_configuration.srcclr_token:
-            expire_srcclr_token(scan_configuration)
+def run_scan(scan_configuration : ScanConfiguration, scan_command, timeout):
+    scan_type_prefix = f"{'Sandbox' if scan_configuration.sandbox_name else 'Policy'} Scan"
+    deadline = datetime.now() + timeout
+    poll_delay = STATUS_POLL_INITIAL_DELAY
+    if scan_configuration.wait_for_timeout and is_build_in_progress(scan_configuration):
+        _, poll_delay = wait_for_previous_scan(scan_configuration, scan_type_prefix, deadline, poll_delay)
 
-    if scan_configuration.sbom_type and not scan_configuration.workspace_name:
-        save_sbom_file(get_upload_sbom(scan_configuration), scan_configuration)
+    while True:
+        returned_value = launch_scan(scan_configuration, scan_command, scan_type_prefix)
+        if not returned_value[0] or not scan_configuration.wait_for_timeout or not has_failed_due_to_concurrent_scan(returned_value[1]):
+            return returned_value
+        has_finished, poll_delay = wait_for_previous_scan(scan_configuration, scan_type_prefix, deadline, poll_delay)
+        if not has_finished:
+            print(f"ERROR: {scan_type_prefix} still running after {scan_configuration.wait_for_timeout} minutes.")
+            return returned_value
+        print(" - Retrying now.")
 
-    parse_all_results(scan_configuration, returned_values)
+def start_platform_scan(scan_configuration: ScanConfiguration, returned_values):
+    start_platform_scan_inner(scan_configuration, returned_values, fetch_upload_sbom=scan_configuration.sbom_type and not scan_configuration.workspace_name)
 
-def start_platform_scan_inner(scan_configuration: ScanConfiguration, returned_values):
+def start_platform_scan_inner(scan_configuration: ScanConfiguration, returned_values, fetch_upload_sbom=False):
     scan_command = ["java", "-jar", scan_configuration.veracode_wrapper_location, "-vid", scan_configuration.vid, "-vkey", scan_configuration.vkey, 
                     "-createsandbox", "true", "-filepath", scan_configuration.source, "-version", scan_configuration.version]
     if (scan_configuration.sandbox_name):
         scan_command.append("-sandboxname")
         scan_command.append(scan_configuration.sandbox_name)
     
-    if (scan_configuration.scan_timeout):
-        scan_command.append("-scantimeout")
-        scan_command.append(scan_configuration.scan_timeout)
-    
     if scan_configuration.verbose:
         scan_command.append("-debug")
 
@@ -100,4 +84,6 @@ def start_platform_scan_inner(scan_configuration: ScanConfiguration, returned_va
         scan_command.append(scan_configuration.include)
 
     scan_result = run_scan(scan_configuration, scan_command, timedelta(minutes=scan_configuration.wait_for_timeout) if scan_configuration.wait_for_timeout else timedelta(minutes=0))
-    returned_values[f"{'Sandbox' if scan_configuration.sandbox_name else 'Policy'} Scan"] = scan_result
\ No newline at end of file
+    if not scan_result[0] and (scan_configuration.scan_timeout or scan_configuration.detach):
+        scan_result = collect_scan_results(scan_configuration, fetch_upload_sbom)
+    store_result(returned_values, f"{'Sandbox' if scan_configuration.sandbox_name else 'Policy'} Scan", scan_result)
\ No newline at end of file
@@ -1,40 +1,84 @@
-from ScanConfiguration import ScanConfiguration
+from ScanConfiguration import ScanConfiguration, Team
+from MetadataCache import invalidate_cached_value
+from TaskGraph import Task, run_task_graph
+from Constants import CACHED_APPLICATION, CACHED_APPLICATION_GUID, CACHED_POLICY_NAME, CACHED_COLLECTION, CACHED_BUSINESS_UNIT, CACHED_TEAM, CACHED_WORKSPACE, MAX_CONCURRENT_LOOKUPS
 from VeracodeApi import create_business_unit, create_team, create_application, create_collection, update_collection, update_application, create_workspace, create_sca_token, get_application_policy_name, add_teams_to_workspace
 
-def pre_scan_actions(scan_configuration: ScanConfiguration):
-    if scan_configuration.team_list:
-        new_team_list = []
-        for team in scan_configuration.team_list:
-            new_team = team
-            if not team.guid:
-                new_team.guid, new_team.legacy_id = create_team(new_team.name, scan_configuration)
-            new_team_list.append(new_team)
-
-        scan_configuration.team_list = new_team_list
-    
-    if scan_configuration.business_unit and not scan_configuration.business_unit_guid:
-        scan_configuration.business_unit_guid = create_business_unit(scan_configuration)
+TEAMS_TASK_PREFIX = "Team: "
+BUSINESS_UNIT_TASK = "Business Unit"
+APPLICATION_TASK = "Application"
+POLICY_NAME_TASK = "Policy Name"
+COLLECTION_TASK = "Collection"
+WORKSPACE_TASK = "Workspace"
+WORKSPACE_TEAMS_TASK = "Workspace Teams"
+SCA_TOKEN_TASK = "SCA Token"
+
+def invalidate_application_cache(scan_configuration: ScanConfiguration):
+    invalidate_cached_value(CACHED_APPLICATION, scan_configuration.application, scan_configuration)
+    invalidate_cached_value(CACHED_APPLICATION_GUID, scan_configuration.application_guid, scan_configuration)
+    invalidate_cached_value(CACHED_POLICY_NAME, scan_configuration.application_guid, scan_configuration)
+
+def create_missing_team(team: Team, scan_configuration: ScanConfiguration):
+    team.guid, team.legacy_id = create_team(team.name, scan_configuration)
+    invalidate_cached_value(CACHED_TEAM, team.name, scan_configuration)
 
+def create_missing_business_unit(scan_configuration: ScanConfiguration):
+    scan_configuration.business_unit_guid = create_business_unit(scan_configuration)
+    invalidate_cached_value(CACHED_BUSINESS_UNIT, scan_configuration.business_unit, scan_configuration)
+
+def create_or_update_application(scan_configuration: ScanConfiguration):
     if not scan_configuration.application_guid:
         application = create_application(scan_configuration)
         scan_configuration.application_guid = application["guid"]
         scan_configuration.application_legacy_id = str(application["id"])
-    elif not scan_configuration.skip_application_update:
-        update_application(scan_configuration)
+        invalidate_application_cache(scan_configuration)
+    elif not scan_configuration.skip_application_update and update_application(scan_configuration):
+        invalidate_application_cache(scan_configuration)
+
+def fetch_policy_name(scan_configuration: ScanConfiguration):
+    scan_configuration.policy_name = get_application_policy_name(scan_configuration.application_guid, scan_configuration)
+
+def create_or_update_collection(scan_configuration: ScanConfiguration):
+    if not scan_configuration.collection_guid:
+        scan_configuration.collection_guid = create_collection(scan_configuration)
+        invalidate_cached_value(CACHED_COLLECTION, scan_configuration.collection, scan_configuration)
+    elif not scan_configuration.skip_collection_update and update_collection(scan_configuration):
+        invalidate_cached_value(CACHED_COLLECTION, scan_configuration.collection, scan_configuration)
+
+def create_missing_workspace(scan_configuration: ScanConfiguration):
+    scan_configuration.workspace_guid = create_workspace(scan_configuration)
+    invalidate_cached_value(CACHED_WORKSPACE, scan_configuration.workspace_name, scan_configuration)
+
+def create_agent_token(scan_configuration: ScanConfiguration):
+    scan_configuration.srcclr_token, scan_configuration.agent_id = create_sca_token(scan_configuration)
+
+def build_pre_scan_tasks(scan_configuration: ScanConfiguration):
+    tasks = []
+    team_tasks = []
+    for team in scan_configuration.team_list or []:
+        if not team.guid:
+            team_task = f"{TEAMS_TASK_PREFIX}{team.name}"
+            tasks.append(Task(team_task, lambda team=team: create_missing_team(team, scan_configuration)))
+            team_tasks.append(team_task)
+
+    if scan_configuration.business_unit and not scan_configuration.business_unit_guid:
+        tasks.append(Task(BUSINESS_UNIT_TASK, lambda: create_missing_business_unit(scan_configuration), team_tasks))
+
+    tasks.append(Task(APPLICATION_TASK, lambda: create_or_update_application(scan_configuration), team_tasks + [BUSINESS_UNIT_TASK]))
 
     if scan_configuration.pipeline_scan:
-        scan_configuration.policy_name = get_application_policy_name(scan_configuration.application_guid, scan_configuration)
+        tasks.append(Task(POLICY_NAME_TASK, lambda: fetch_policy_name(scan_configuration), [APPLICATION_TASK]))
 
     if scan_configuration.collection:
-        if not scan_configuration.collection_guid:
-            scan_configuration.collection_guid = create_collection(scan_configuration)
-        elif not scan_configuration.skip_collection_update:
-            update_collection(scan_configuration)
+        tasks.append(Task(COLLECTION_TASK, lambda: create_or_update_collection(scan_configuration), [APPLICATION_TASK, BUSINESS_UNIT_TASK]))
 
     if scan_configuration.workspace_name:
         if not scan_configuration.workspace_guid:
-            scan_configuration.workspace_guid = create_workspace(scan_configuration)
-        add_teams_to_workspace(scan_configuration)
-        scan_configuration.srcclr_token, scan_configuration.agent_id = create_sca_token(scan_configuration)
+            tasks.append(Task(WORKSPACE_TASK, lambda: create_missing_workspace(scan_configuration)))
+        tasks.append(Task(WORKSPACE_TEAMS_TASK, lambda: add_teams_to_workspace(scan_configuration), team_tasks + [WORKSPACE_TASK]))
+        tasks.append(Task(SCA_TOKEN_TASK, lambda: create_agent_token(scan_configuration), [WORKSPACE_TASK]))
+    return tasks
 
-    return scan_configuration
+def pre_scan_actions(scan_configuration: ScanConfiguration):
+    run_task_graph(build_pre_scan_tasks(scan_configuration), MAX_CONCURRENT_LOOKUPS)
+    return scan_configuration
\ No newline at end of file
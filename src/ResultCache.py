@@ -0,0 +1,106 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from MetadataCache import get_user_cache_directory
+from Constants import RESULT_CACHE_DIRECTORY_NAME, RESULT_CACHE_METADATA_FILE, HASH_CHUNK_SIZE, TIMED_OUT_RETURN_CODE
+from ErrorHandler import show_warning
+
+eviction_lock = threading.Lock()
+
+def get_result_cache_directory():
+    result_cache_directory = os.path.join(get_user_cache_directory(), RESULT_CACHE_DIRECTORY_NAME)
+    Path(result_cache_directory).mkdir(parents=True, exist_ok=True)
+    return result_cache_directory
+
+def get_file_hash(file_location):
+    file_hash = hashlib.sha256()
+    with open(file_location, 'rb') as file_to_hash:
+        for chunk in iter(lambda: file_to_hash.read(HASH_CHUNK_SIZE), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+def get_result_cache_key(artifact_location, policy_file_name, include):
+    return hashlib.sha256(f"{get_file_hash(artifact_location)}|{policy_file_name}|{include or ''}".encode("utf-8")).hexdigest()
+
+def read_entry_metadata(entry_directory):
+    try:
+        with open(os.path.join(entry_directory, RESULT_CACHE_METADATA_FILE), 'r') as metadata_file:
+            return json.load(metadata_file)
+    except (OSError, ValueError):
+        return None
+
+def write_entry_metadata(entry_directory, metadata):
+    with open(os.path.join(entry_directory, RESULT_CACHE_METADATA_FILE), 'w') as metadata_file:
+        json.dump(metadata, metadata_file)
+
+def get_cached_result(cache_key, results_json, results_txt):
+    entry_directory = os.path.join(get_result_cache_directory(), cache_key)
+    metadata = read_entry_metadata(entry_directory)
+    if not metadata:
+        return None
+    try:
+        shutil.copyfile(os.path.join(entry_directory, "results.json"), results_json)
+        shutil.copyfile(os.path.join(entry_directory, "results.txt"), results_txt)
+        metadata["last_used"] = time.time()
+        write_entry_metadata(entry_directory, metadata)
+    except OSError:
+        return None
+    return tuple(metadata["returned_value"])
+
+def remove_previous_results(results_json, results_txt):
+    for results_file in [results_json, results_txt]:
+        try:
+            os.remove(results_file)
+        except FileNotFoundError:
+            pass
+
+def has_valid_results(results_json, results_txt):
+    if not os.path.isfile(results_txt):
+        return False
+    try:
+        with open(results_json, 'r') as results_file:
+            return isinstance(json.load(results_file), dict)
+    except (OSError, ValueError):
+        return False
+
+def is_conclusive_result(returned_value, results_json, results_txt):
+    # Failures that left no results behind (network, authentication, tool errors) say nothing about the artifact
+    return returned_value[0] != TIMED_OUT_RETURN_CODE and has_valid_results(results_json, results_txt)
+
+def save_result(cache_key, returned_value, results_json, results_txt, max_cache_size):
+    if not is_conclusive_result(returned_value, results_json, results_txt):
+        return
+    result_cache_directory = get_result_cache_directory()
+    entry_directory = os.path.join(result_cache_directory, cache_key)
+    temporary_directory = f"{entry_directory}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        Path(temporary_directory).mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(results_json, os.path.join(temporary_directory, "results.json"))
+        shutil.copyfile(results_txt, os.path.join(temporary_directory, "results.txt"))
+        write_entry_metadata(temporary_directory, {"returned_value": list(returned_value), "last_used": time.time(),
+                                                   "size": os.path.getsize(results_json) + os.path.getsize(results_txt)})
+        shutil.rmtree(entry_directory, ignore_errors=True)
+        os.replace(temporary_directory, entry_directory)
+    except OSError as e:
+        shutil.rmtree(temporary_directory, ignore_errors=True)
+        show_warning(f"Unable to save pipeline scan result to cache: {e}")
+        return
+    evict_least_recently_used(result_cache_directory, max_cache_size)
+
+def evict_least_recently_used(result_cache_directory, max_cache_size):
+    with eviction_lock:
+        entries = []
+        for cache_key in os.listdir(result_cache_directory):
+            metadata = read_entry_metadata(os.path.join(result_cache_directory, cache_key))
+            if metadata:
+                entries.append((metadata["last_used"], metadata["size"], cache_key))
+        total_size = sum(map(lambda entry: entry[1], entries))
+        for _, size, cache_key in sorted(entries):
+            if total_size <= max_cache_size:
+                break
+            shutil.rmtree(os.path.join(result_cache_directory, cache_key), ignore_errors=True)
+            total_size -= size
\ No newline at end of file
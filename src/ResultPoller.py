@@ -0,0 +1,98 @@
+import os
+import json
+from pathlib import Path
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from ScanConfiguration import ScanConfiguration
+from NativeUpload import wait_for_build, print_progress
+from VeracodeApi import get_upload_sbom, get_sandbox_id, get_build, get_build_status
+from CliCaller import save_sbom_file
+from ParallelScanHandler import store_result, add_generated_output_file, parse_all_results
+from ErrorHandler import exit_with_error
+from Constants import RESULTS_READY_STATUS, FAILED_BUILD_STATUSES, POLICY_CALCULATING_STATUS, POLICY_NOT_PASSED_STATUS, POLICY_NOT_PASSED_RETURN_CODE
+
+def get_scan_type_prefix(scan_configuration: ScanConfiguration):
+    return f"{'Sandbox' if scan_configuration.sandbox_name else 'Policy'} Scan"
+
+def find_submitted_build_id(scan_configuration: ScanConfiguration, sandbox_id):
+    build = get_build(scan_configuration, sandbox_id)
+    if build is None or build.get("version") != scan_configuration.version:
+        return None
+    return build.get("build_id")
+
+def is_build_finished(build):
+    build_status = get_build_status(build)
+    return build_status == RESULTS_READY_STATUS or any(failed_status in build_status for failed_status in FAILED_BUILD_STATUSES)
+
+def get_policy_compliance_status(scan_configuration: ScanConfiguration, sandbox_id, build_id, deadline):
+    build = wait_for_build(scan_configuration, sandbox_id, build_id, lambda build: build.get("policy_compliance_status") != POLICY_CALCULATING_STATUS, deadline)
+    return build.get("policy_compliance_status", "") if build is not None else POLICY_CALCULATING_STATUS
+
+def fetch_sbom(scan_configuration: ScanConfiguration):
+    save_sbom_file(get_upload_sbom(scan_configuration), scan_configuration)
+
+def wait_for_scan_results(scan_configuration: ScanConfiguration, sandbox_id, build_id, fetch_upload_sbom):
+    scan_type_prefix = get_scan_type_prefix(scan_configuration)
+    scan_timeout = int(scan_configuration.scan_timeout or 0)
+    print_progress(scan_type_prefix, f"Waiting up to {scan_timeout} minutes for build {build_id} to complete")
+    deadline = datetime.now() + timedelta(minutes=scan_timeout)
+    build = wait_for_build(scan_configuration, sandbox_id, build_id, is_build_finished, deadline)
+    if build is None:
+        return 1, f"Build {build_id} did not complete within {scan_timeout} minutes", build_id
+    build_status = get_build_status(build)
+    if build_status != RESULTS_READY_STATUS:
+        return 1, f"Build {build_id} finished with status '{build_status}'", build_id
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        sbom = executor.submit(fetch_sbom, scan_configuration) if fetch_upload_sbom else None
+        policy_compliance_status = executor.submit(get_policy_compliance_status, scan_configuration, sandbox_id, build_id, deadline).result()
+        if sbom:
+            sbom.result()
+    if policy_compliance_status == POLICY_NOT_PASSED_STATUS:
+        return POLICY_NOT_PASSED_RETURN_CODE, f"Scan completed, policy status: {policy_compliance_status}", build_id
+    return 0, f"Scan completed, policy status: {policy_compliance_status}", build_id
+
+def save_scan_state(scan_configuration: ScanConfiguration, sandbox_id, build_id):
+    Path(os.path.dirname(scan_configuration.state_file)).mkdir(parents=True, exist_ok=True)
+    with open(scan_configuration.state_file, 'w') as state_file:
+        json.dump({"application_guid": scan_configuration.application_guid, "application_legacy_id": scan_configuration.application_legacy_id,
+                   "sandbox_name": scan_configuration.sandbox_name, "sandbox_id": sandbox_id, "build_id": build_id, "version": scan_configuration.version}, state_file, indent=2)
+    add_generated_output_file(scan_configuration, "Scan state", scan_configuration.state_file)
+
+def collect_scan_results(scan_configuration: ScanConfiguration, fetch_upload_sbom):
+    try:
+        sandbox_id = get_sandbox_id(scan_configuration) if scan_configuration.sandbox_name else None
+        build_id = find_submitted_build_id(scan_configuration, sandbox_id)
+    except Exception as e:
+        return 1, f"Unable to find the submitted scan: {e}", ''
+    if not build_id:
+        return 1, f"Unable to find the submitted scan '{scan_configuration.version}'", ''
+    if scan_configuration.detach:
+        save_scan_state(scan_configuration, sandbox_id, build_id)
+        return 0, f"Submitted build {build_id}, run again with --resume to collect the results", build_id
+    try:
+        return wait_for_scan_results(scan_configuration, sandbox_id, build_id, fetch_upload_sbom)
+    except Exception as e:
+        return 1, str(e), build_id
+
+def load_scan_state(scan_configuration: ScanConfiguration):
+    try:
+        with open(scan_configuration.state_file, 'r') as state_file:
+            return json.load(state_file)
+    except (OSError, ValueError) as e:
+        exit_with_error(f"Unable to read scan state from {scan_configuration.state_file}: {e}", -1, scan_configuration)
+
+def resume_platform_scan(scan_configuration: ScanConfiguration):
+    scan_state = load_scan_state(scan_configuration)
+    scan_configuration.application_guid = scan_state["application_guid"]
+    scan_configuration.application_legacy_id = scan_state["application_legacy_id"]
+    scan_configuration.sandbox_name = scan_state["sandbox_name"]
+    scan_configuration.version = scan_state["version"]
+    returned_values = {}
+    try:
+        scan_result = wait_for_scan_results(scan_configuration, scan_state["sandbox_id"], scan_state["build_id"],
+                                            scan_configuration.sbom_type and not scan_configuration.workspace_name)
+    except Exception as e:
+        scan_result = 1, str(e), scan_state["build_id"]
+    store_result(returned_values, get_scan_type_prefix(scan_configuration), scan_result)
+    parse_all_results(scan_configuration, returned_values)
@@ -1,11 +1,12 @@
 import argparse
 import os
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 import urllib.parse
 from pathlib import Path
 from datetime import datetime
-from Constants import ALLOWED_CRITICALITIES, ALLOWED_DELETE_INCOMPLETE_SCAN, SBOM_TYPES, SCAN_TYPES, SCA_URL_MAP
-from VeracodeApi import get_application, get_application_by_guid, get_collection_id, get_business_unit_id, get_team_ids, get_workspace_id
-from veracode_api_py.apihelper import get_region_for_api_credential
+from Constants import ALLOWED_CRITICALITIES, ALLOWED_DELETE_INCOMPLETE_SCAN, SBOM_TYPES, SCAN_TYPES, SCA_URL_MAP, DEFAULT_METADATA_CACHE_TTL, DEFAULT_RESULT_CACHE_SIZE_IN_MB, MAX_CONCURRENT_LOOKUPS, SCAN_STATE_FILE_NAME, DEFAULT_MAX_PARALLEL_SCA_SCANS, NATIVE_UPLOAD_MAX_WORKERS, SBOM_COMPRESSION_EXTENSIONS
+from ScanScheduler import get_default_max_parallel_scans
 from ErrorHandler import exit_with_error
 from ColourHandler import ERROR_PREFIX_COLOUR, RESET_STYLE, INFO_PREFIX_COLOUR, WARNING_MESSAGE_COLOUR
 
@@ -14,9 +15,10 @@ class Team:
     guid: str
     legacy_id : str
 
-    def __init__(self, name, scan_configuration):
+    def __init__(self, name):
         self.name = name
-        self.guid, self.legacy_id = get_team_ids(name, scan_configuration)
+        self.guid = None
+        self.legacy_id = None
 
 class CustomField:
     name : str
@@ -62,6 +64,9 @@ class ScanConfiguration:
     vid : str = None
     vkey : str = None
     scan_timeout : int = 0
+    detach : bool = False
+    resume : bool = False
+    state_file : str = None
     veracode_cli_location : str = None
     veracode_wrapper_location : str = None
     include : str = None
@@ -75,6 +80,8 @@ class ScanConfiguration:
     workspace_guid : str = None
     project_guid : str = None
     sbom_type : str = None
+    sbom_pretty : bool = False
+    sbom_compression : str = None
     generated_output_files : list = []
 
     srcclr_token : str = None
@@ -104,6 +111,20 @@ class ScanConfiguration:
     cleanup_before_exit : bool = False
     has_generated_files : bool = False
     fallback_sandbox : str = None
+    hybrid_scan : bool = False
+    fallback_artifacts : list[str] = []
+    stream_pipeline_scans : bool = False
+    max_parallel_scans : int = None
+    fail_fast : bool = False
+    process_timeout : int = 0
+    packaging_cache : bool = False
+    result_cache : bool = False
+    result_cache_size : int = DEFAULT_RESULT_CACHE_SIZE_IN_MB
+    metadata_cache : bool = False
+    metadata_cache_ttl : int = DEFAULT_METADATA_CACHE_TTL
+    native_upload : bool = False
+    incremental_sca : bool = False
+    max_parallel_sca_scans : int = DEFAULT_MAX_PARALLEL_SCA_SCANS
 
     def hide_value(self, value):
         return "*" * len(value)
@@ -134,10 +155,12 @@ class ScanConfiguration:
         return os.path.isdir(os.path.join(directory, ".git"))
 
     def get_git_root(self, scan_source):
-        current_directory = scan_source
-        while current_directory and not self.has_git_folder(current_directory):
-            current_directory = Path(current_directory).parent.absolute()
-        return current_directory if current_directory else scan_source
+        current_directory = Path(scan_source).absolute()
+        while not self.has_git_folder(current_directory):
+            if current_directory.parent == current_directory:
+                return scan_source
+            current_directory = current_directory.parent
+        return str(current_directory)
 
     def set_proxy_environment(self, proxy_url: str, proxy_port: str, proxy_username: str, proxy_password: str):
         proxy_url = proxy_url.strip().lower()
@@ -160,20 +183,49 @@ class ScanConfiguration:
         os.environ['https_proxy'] = proxy_to_use
         os.environ['HTTPS_PROXY'] = proxy_to_use
 
-    def validate_input(self):        
-        errors = []
+    def start_platform_lookups(self, executor):
+        from VeracodeApi import get_application, get_application_by_guid, get_collection_id, get_business_unit_id, get_team_ids, get_workspace_id, start_lookup
+        lookups = {}
+        lookups["teams"] = list(map(lambda team: start_lookup(executor, get_team_ids, team.name, self), self.team_list))
+        if self.application:
+            lookups["application"] = start_lookup(executor, get_application, self.application.strip(), self)
+        elif self.application_guid:
+            lookups["application"] = start_lookup(executor, get_application_by_guid, self.application_guid, self)
+        if self.collection:
+            lookups["collection"] = start_lookup(executor, get_collection_id, self.collection, self)
+        if self.business_unit:
+            lookups["business_unit"] = start_lookup(executor, get_business_unit_id, self.business_unit, self)
+        if self.workspace_name:
+            lookups["workspace"] = start_lookup(executor, get_workspace_id, self.workspace_name, self)
+        return lookups
+
+    def get_api_pool_size(self):
+        return max(MAX_CONCURRENT_LOOKUPS, NATIVE_UPLOAD_MAX_WORKERS, self.max_parallel_sca_scans, self.max_parallel_scans)
+
+    def validate_input(self):
+        errors = self.validate_local_input([])
+        if errors:
+            exit_with_error(errors, len(errors)*-1, self)
+        if self.proxy_url:
+            self.set_proxy_environment(self.proxy_url, self.proxy_port, self.proxy_username, self.proxy_password)
+        if self.wait_for_timeout:
+            self.wait_for_timeout = int(self.wait_for_timeout)
+
+        from ApiSession import configure_api_session
+        configure_api_session(self.get_api_pool_size())
+        executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_LOOKUPS)
+        try:
+            errors = self.validate_input_with_lookups(self.start_platform_lookups(executor), [])
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if errors:
+            exit_with_error(errors, len(errors)*-1, self)
+
+    def validate_local_input(self, errors):
         errors = self.validate_field_size(errors, self.application, "-a/--application", "Application name", 256)
-        application = None
         if self.application:
             self.application = self.application.strip()
-            application = get_application(self.application, self)
-        elif self.application_guid:
-            application = get_application_by_guid(self.application_guid, self)
-            if application:
-                self.application = application["profile"]["name"]
-            else:
-                self.append_error(errors, self.application_guid, "-ai/--application_guid", "No application found for GUID")
-        else:
+        elif not self.application_guid:
             errors.append(f"ERROR: either '-a/--application' (Application Name) or '-ai/--application_guid' (Application GUID) are required to run a scan")
 
         errors = self.validate_field(errors, self.delete_incomplete_scan, "-del/--delete_incomplete_scan", "Delete Incomplete Scan must be one of these values: 0, 1, 2", lambda delete_incomplete_scan: not delete_incomplete_scan in ALLOWED_DELETE_INCOMPLETE_SCAN)
@@ -184,6 +236,20 @@ class ScanConfiguration:
                 self.append_error(errors, self.wait_for_timeout, "-e/--exclude", "Pipeline scans do not support --exclude")
             if self.scan_all_non_fatal_top_level_modules:
                 self.append_error(errors, self.scan_all_non_fatal_top_level_modules, "-sanftlm/--scan_all_non_fatal_top_level_modules", "Pipeline scans do not support --scan_all_non_fatal_top_level_modulesclude")
+        if self.fail_fast and (not self.fail_build or not self.pipeline_scan):
+            self.append_error(errors, self.fail_fast, "-ff/--fail_fast", "Fail fast requires both -f/--fail_build and -ps/--pipeline_scan")
+        if self.process_timeout < 0:
+            self.append_error(errors, self.process_timeout, "-pt/--process_timeout", "Process timeout cannot be negative")
+        if self.result_cache_size < 1:
+            self.append_error(errors, self.result_cache_size, "-rscs/--result_cache_size", "Result cache size must be at least 1 MB")
+        if self.metadata_cache_ttl < 0:
+            self.append_error(errors, self.metadata_cache_ttl, "-mct/--metadata_cache_ttl", "Metadata cache TTL cannot be negative")
+        if self.native_upload and self.pipeline_scan and not self.fallback_sandbox:
+            self.append_error(errors, self.native_upload, "-nu/--native_upload", "Native upload is only used for Policy and Sandbox scans (or the -fs/--fallback_sandbox of a pipeline scan)")
+        if self.incremental_sca and not self.workspace_name:
+            self.append_error(errors, self.incremental_sca, "-isca/--incremental_sca", "Incremental agent-based SCA scans require -wn/--workspace_name")
+        if self.max_parallel_sca_scans < 1:
+            self.append_error(errors, self.max_parallel_sca_scans, "-mpsca/--max_parallel_sca_scans", "Maximum parallel SCA scans must be at least 1")
         if self.wait_for_timeout:
             if self.pipeline_scan:
                 self.append_error(errors, self.wait_for_timeout, "-wt/--wait_for_timeout", "Pipeline scans do not support (or require) --wait_for_timeout")
@@ -193,13 +259,6 @@ class ScanConfiguration:
         if self.scan_all_non_fatal_top_level_modules and self.exclude:
             self.append_error(errors, self.scan_all_non_fatal_top_level_modules, "-sanftlm/--scan_all_non_fatal_top_level_modules", "-e/--exclude and -sanftlm/--scan_all_non_fatal_top_level_modules are mutually exclusive")
 
-        if application:
-            self.application_guid = application["guid"]
-            self.application_legacy_id = str(application["id"])
-
-        if not self.application_guid and self.require_application:
-            self.append_error(errors, self.application, "-a/--application", "Application does not exist and is required (--require_application was used).")
-
         errors = self.validate_field_size(errors, self.description, "-desc/--description", "Description", 4000)   
         errors = self.validate_field_size(errors, self.application_tags, "-at/--application_tags", "Application Tags", 512)
 
@@ -211,12 +270,6 @@ class ScanConfiguration:
         errors = self.validate_field_size(errors, self.git_repo_url, "-url/--git_repo_url", "Git Repo URL", 512)
 
         errors = self.validate_field_size(errors, self.collection, "-c/--collection", "Collection name", 256)
-        if self.collection:
-            self.collection_guid = get_collection_id(self.collection, self)
-
-        if not self.collection_guid and self.require_collection:
-            self.append_error(errors, self.application, "-c/--collection", "Collection does not exist and is required (--require_collection was used).")
-
         errors = self.validate_field_size(errors, self.collection_description, "-cd/--collection_description", "Collection Description", 4000)
         errors = self.validate_field_size(errors, self.collection_tags, "-ct/--collection_tags", "Collection Tags", 512)
         errors = self.validate_list(errors, self.collection_custom_fields, "-cc/--collection_custom_field", lambda custom_field: custom_field.error, lambda custom_field: custom_field.value, lambda custom_field: custom_field.error)
@@ -225,17 +278,10 @@ class ScanConfiguration:
             errors = self.validate_field(errors, self.collection_tags, "-ct/--collection_tags", "Collection Tags require a collection", lambda collection_tags: bool(collection_tags))
             errors = self.validate_field(errors, self.collection_custom_fields, "-cc/--collection_custom_field", "Collection Custom Field requires a collection", lambda collection_custom_fields: bool(collection_custom_fields))
 
-        if self.business_unit:
-            self.business_unit_guid = get_business_unit_id(self.business_unit, self)
-            if self.require_business_unit and not self.business_unit_guid:
-                self.append_error(errors, self.business_unit, "-bu/--business_unit", "Business unit does not exist and is required (--require_business_unit was used).")
-
         errors = self.validate_field_size(errors, self.business_owner, "-bo/--business_owner", "Business Owner name", 128)
         errors = self.validate_field_size(errors, self.business_owner_email, "-boe/--business_owner_email", "Business Owner E-mail", 256)
 
         errors = self.validate_list(errors, self.team_list, "-t/--team", lambda team: len(team.name) > 256, lambda team: team.name, lambda _: "Team name cannot be longer than 256 characters")
-        if self.require_teams:
-            self.validate_list(errors, self.team_list, "-t/--team", lambda team: not team.guid, lambda team: team.name, lambda _: "Team does not exist and is required (--require_teams was used).")
         
         self.scan_type = self.scan_type.replace(" ", "").lower() if self.scan_type else ""
         errors = self.validate_field(errors, self.scan_type, "-st/--scan_type", "Type must be one of these values: folder, artifact", lambda scan_type: not scan_type in SCAN_TYPES)
@@ -248,6 +294,23 @@ class ScanConfiguration:
                 errors = self.append_error(errors, self.cleanup_before_start, "-cbs/--cleanup_before_start", "Clearing the build output directory before running a build is only available for --scan_type 'folder'")
             if self.cleanup_before_exit:
                 errors = self.append_error(errors, self.cleanup_before_exit, "-cbe/--cleanup_before_exit", "Clearing the build output directory after running a scan is only available for --scan_type 'folder'")
+            if self.packaging_cache:
+                errors = self.append_error(errors, self.packaging_cache, "-pc/--packaging_cache", "Reusing packaged artifacts is only available for --scan_type 'folder'")
+
+        if self.stream_pipeline_scans:
+            if not self.pipeline_scan:
+                errors = self.append_error(errors, self.stream_pipeline_scans, "-sps/--stream_pipeline_scans", "Streaming is only available for pipeline scans (-ps/--pipeline_scan)")
+            if self.scan_type != "folder":
+                errors = self.append_error(errors, self.stream_pipeline_scans, "-sps/--stream_pipeline_scans", "Streaming is only available for --scan_type 'folder'")
+            if self.fallback_sandbox and not self.hybrid_scan:
+                errors = self.append_error(errors, self.stream_pipeline_scans, "-sps/--stream_pipeline_scans", "-sps/--stream_pipeline_scans requires -hs/--hybrid_scan when using -fs/--fallback_sandbox")
+        if self.hybrid_scan and (not self.pipeline_scan or not self.fallback_sandbox):
+            errors = self.append_error(errors, self.hybrid_scan, "-hs/--hybrid_scan", "Hybrid scans require both -ps/--pipeline_scan and -fs/--fallback_sandbox")
+
+        if self.max_parallel_scans is not None and self.max_parallel_scans < 1:
+            errors = self.append_error(errors, self.max_parallel_scans, "-mps/--max_parallel_scans", "Maximum parallel scans must be at least 1")
+        elif not self.max_parallel_scans:
+            self.max_parallel_scans = get_default_max_parallel_scans()
 
         if self.pipeline_scan and self.sandbox_name:
             errors = self.append_error(errors, self.sandbox_name, "-sn/--sandbox_name", "Pipeline scan does not support a sandbox name")            
@@ -260,15 +323,17 @@ class ScanConfiguration:
             errors = self.append_error(errors, self.version, "-v/--version", "Scan name is required for Policy and Sandbox scans")
 
         errors = self.validate_field_size(errors, self.workspace_name, "-wn/--workspace_name", "Workspace Name", 512)
-        if self.workspace_name:
-            self.workspace_guid = get_workspace_id(self.workspace_name, self)
-            now = datetime.now()
-            self.sca_agent_name = f"{now.year}{now.month}{now.day}{now.hour}{now.minute}{now.second}{now.microsecond}"
-            self.srcclr_api_url = SCA_URL_MAP[get_region_for_api_credential(self.vid)]
         self.sbom_type = self.sbom_type.replace(" ", "").upper() if self.sbom_type else ""
         errors = self.validate_field(errors, self.sbom_type, "-sbom/--sbom_type", "SBOM Type must be one of these values: CYCLONEDX, SPDX", lambda sbom_type: not sbom_type in SBOM_TYPES)
-        if self.sbom_type and not self.scan_timeout and not self.workspace_name:
-            errors = self.append_error(errors, self.sbom_type, "-sbom/--sbom_type", "For fetching an SBOM --scan_timeout or --workspace_name needs to be set")
+        if self.sbom_type and not self.scan_timeout and not self.workspace_name and not self.detach and not self.resume:
+            errors = self.append_error(errors, self.sbom_type, "-sbom/--sbom_type", "For fetching an SBOM --scan_timeout, --detach or --workspace_name needs to be set")
+        self.sbom_compression = self.sbom_compression.replace(" ", "").upper() if self.sbom_compression else ""
+        errors = self.validate_field(errors, self.sbom_compression, "-sbomc/--sbom_compression", "SBOM Compression must be one of these values: GZIP, ZSTD", lambda sbom_compression: not sbom_compression in SBOM_COMPRESSION_EXTENSIONS)
+        if self.sbom_compression == "ZSTD":
+            errors = self.validate_field(errors, self.sbom_compression, "-sbomc/--sbom_compression", "ZSTD compression requires the zstandard package (pip install zstandard)", lambda _: not importlib.util.find_spec("zstandard"))
+        if not self.sbom_type:
+            errors = self.validate_field(errors, self.sbom_pretty, "-sbomp/--sbom_pretty", "Pretty-printing requires -sbom/--sbom_type", lambda sbom_pretty: bool(sbom_pretty))
+            errors = self.validate_field(errors, self.sbom_compression, "-sbomc/--sbom_compression", "SBOM Compression requires -sbom/--sbom_type", lambda sbom_compression: bool(sbom_compression))
 
         errors = self.validate_field_size(errors, self.version, "-v/--version", "Scan name", 256)
 
@@ -282,6 +347,15 @@ class ScanConfiguration:
         if not os.path.isdir(self.base_cli_directory):
             self.base_cli_directory = os.path.dirname(self.base_cli_directory)
 
+        if not self.state_file:
+            self.state_file = os.path.join(self.base_cli_directory, "scan_results", SCAN_STATE_FILE_NAME)
+        if self.detach and self.resume:
+            errors = self.append_error(errors, self.detach, "-dt/--detach", "--detach and --resume are mutually exclusive")
+        if self.detach and self.pipeline_scan:
+            errors = self.append_error(errors, self.detach, "-dt/--detach", "Pipeline scans do not support --detach")
+        if self.resume:
+            errors = self.validate_field(errors, self.state_file, "-sf/--state_file", f"Scan state not found at {self.state_file}, it is created by running with --detach", lambda state_file: not os.path.isfile(state_file))
+
         if not self.proxy_url:
             errors = self.validate_field(errors, self.proxy_port, "-pport/--proxy_port", "To use proxy, a URL must be set", lambda port: bool(port))
             errors = self.validate_field(errors, self.proxy_username, "-puser/--proxy_username", "To use proxy, a URL must be set", lambda username: bool(username))
@@ -292,18 +366,58 @@ class ScanConfiguration:
             if self.proxy_password and not self.proxy_username:
                 errors = self.append_error(errors, "''", "-ppass/--proxy_password", "A proxy password requires a proxy username (-puser/--proxy_username)", mask_value=True)
 
-        if errors:
-            exit_with_error(errors, len(errors)*-1, self)
-        if self.proxy_url:
-            self.set_proxy_environment(self.proxy_url, self.proxy_port, self.proxy_username, self.proxy_password)
-        if self.wait_for_timeout:
-            self.wait_for_timeout = int(self.wait_for_timeout)
+        return errors
+
+    def validate_input_with_lookups(self, lookups, errors):
+        from VeracodeApi import get_lookup_result
+        from veracode_api_py.apihelper import get_region_for_api_credential
+        for team, team_lookup in zip(self.team_list, lookups["teams"]):
+            team.guid, team.legacy_id = get_lookup_result(team_lookup, self)
+
+        application = None
+        if self.application:
+            application = get_lookup_result(lookups["application"], self)
+        elif self.application_guid:
+            application = get_lookup_result(lookups["application"], self)
+            if application:
+                self.application = application["profile"]["name"]
+            else:
+                self.append_error(errors, self.application_guid, "-ai/--application_guid", "No application found for GUID")
+
+        if application:
+            self.application_guid = application["guid"]
+            self.application_legacy_id = str(application["id"])
+
+        if not self.application_guid and self.require_application:
+            self.append_error(errors, self.application, "-a/--application", "Application does not exist and is required (--require_application was used).")
+
+        if self.collection:
+            self.collection_guid = get_lookup_result(lookups["collection"], self)
+
+        if not self.collection_guid and self.require_collection:
+            self.append_error(errors, self.application, "-c/--collection", "Collection does not exist and is required (--require_collection was used).")
+
+        if self.business_unit:
+            self.business_unit_guid = get_lookup_result(lookups["business_unit"], self)
+            if self.require_business_unit and not self.business_unit_guid:
+                self.append_error(errors, self.business_unit, "-bu/--business_unit", "Business unit does not exist and is required (--require_business_unit was used).")
+
+        if self.require_teams:
+            self.validate_list(errors, self.team_list, "-t/--team", lambda team: not team.guid, lambda team: team.name, lambda _: "Team does not exist and is required (--require_teams was used).")
+
+        if self.workspace_name:
+            self.workspace_guid = get_lookup_result(lookups["workspace"], self)
+            now = datetime.now()
+            self.sca_agent_name = f"{now.year}{now.month}{now.day}{now.hour}{now.minute}{now.second}{now.microsecond}"
+            self.srcclr_api_url = SCA_URL_MAP[get_region_for_api_credential(self.vid)]
+
+        return errors
 
     def parse_custom_field_list(self, custom_field_list):
         return list(map(lambda custom_field: CustomField(custom_field), custom_field_list)) if custom_field_list else []
 
     def parse_team_list(self, team_list):
-        return list(map(lambda team_name: Team(team_name, self), team_list)) if team_list else []
+        return list(map(lambda team_name: Team(team_name), team_list)) if team_list else []
 
     def __init__(self):
         parser = argparse.ArgumentParser(
@@ -493,7 +607,20 @@ class ScanConfiguration:
         parser.add_argument(
             "-sbom",
             "--sbom_type",
-            help="(optional) Set the type of SBOM to fetch for the project after the scan - if using Policy/Sandbox scan, requires a scan_timeout.",
+            help="(optional) Set the type of SBOM to fetch for the project after the scan - if using Policy/Sandbox scan, requires a scan_timeout or --detach.",
+            required=False,
+        )
+        parser.add_argument(
+            "-sbomp",
+            "--sbom_pretty",
+            help="(optional) Pass this flag to indent the saved SBOM - by default it is saved as returned by the API (compact), without being parsed.",
+            required=False,
+            action=argparse.BooleanOptionalAction
+        )
+        parser.add_argument(
+            "-sbomc",
+            "--sbom_compression",
+            help="(optional) Compress the saved SBOM, one of: GZIP, ZSTD (requires the zstandard package).",
             required=False,
         )
         parser.add_argument(
@@ -570,6 +697,26 @@ class ScanConfiguration:
             help="(optional) Scan timeout (in minutes). If empty or 0, will not wait for Sandbox/Policy scans to complete.",
             required=False
         )
+        parser.add_argument(
+            "-dt",
+            "--detach",
+            help="(optional) Pass this flag to return as soon as the Sandbox/Policy scan is submitted, saving its state to --state_file so the results can be collected later with --resume.",
+            required=False,
+            action=argparse.BooleanOptionalAction
+        )
+        parser.add_argument(
+            "-rs",
+            "--resume",
+            help="(optional) Pass this flag to collect the results of a scan submitted with --detach, waiting up to --scan_timeout minutes for it to complete.",
+            required=False,
+            action=argparse.BooleanOptionalAction
+        )
+        parser.add_argument(
+            "-sf",
+            "--state_file",
+            help=f"(optional) Location of the file used by --detach and --resume - defaults to scan_results/{SCAN_STATE_FILE_NAME} in the scan source directory.",
+            required=False
+        )
         parser.add_argument(
             "-f",
             "--fail_build",
@@ -577,6 +724,13 @@ class ScanConfiguration:
             required=False,
             action=argparse.BooleanOptionalAction
         )
+        parser.add_argument(
+            "-ff",
+            "--fail_fast",
+            help="(optional) Pass this flag to cancel the remaining pipeline scans as soon as one of them fails - requires --fail_build.",
+            required=False,
+            action=argparse.BooleanOptionalAction
+        )
         parser.add_argument(
             "-o",
             "--override_failure",
@@ -643,6 +797,94 @@ class ScanConfiguration:
             help="(optional) Sandbox name to fallback to if packaged application is bigger than 200MB (pipeline scan limit).",
             required=False
         )
+        parser.add_argument(
+            "-hs",
+            "--hybrid_scan",
+            help="(optional) Pass this flag to only send the artifacts bigger than 200MB to the --fallback_sandbox, while every other artifact is still scanned with the pipeline scan.",
+            required=False,
+            action=argparse.BooleanOptionalAction
+        )
+        parser.add_argument(
+            "-sps",
+            "--stream_pipeline_scans",
+            help="(optional) Pass this flag to start each pipeline scan as soon as the Veracode Packager finishes writing its artifact, instead of waiting for the whole build - only available for --scan_type 'folder'.",
+            required=False,
+            action=argparse.BooleanOptionalAction
+        )
+        parser.add_argument(
+            "-mps",
+            "--max_parallel_scans",
+            help="(optional) Maximum number of pipeline scans to run at the same time - defaults to a value based on the available CPUs and memory.",
+            type=int,
+            required=False
+        )
+        parser.add_argument(
+            "-pt",
+            "--process_timeout",
+            help="(optional) Timeout (in minutes) for each process started by this tool (packager, scans, agent-based SCA) - processes still running after it are stopped. If empty or 0, processes have no timeout.",
+            type=int,
+            default=0,
+            required=False
+        )
+        parser.add_argument(
+            "-pc",
+            "--packaging_cache",
+            help="(optional) Pass this flag to reuse the artifacts of the previous Veracode Packager run if the source did not change since then - only available for --scan_type 'folder'.",
+            required=False,
+            action=argparse.BooleanOptionalAction
+        )
+        parser.add_argument(
+            "-rsc",
+            "--result_cache",
+            help="(optional) Pass this flag to reuse the pipeline scan results of artifacts that did not change since a previous scan with the same policy and --include filter.",
+            required=False,
+            action=argparse.BooleanOptionalAction
+        )
+        parser.add_argument(
+            "-rscs",
+            "--result_cache_size",
+            help=f"(optional) Maximum size (in MB) of the pipeline scan result cache, least recently used results are removed first - defaults to {DEFAULT_RESULT_CACHE_SIZE_IN_MB}.",
+            type=int,
+            default=DEFAULT_RESULT_CACHE_SIZE_IN_MB,
+            required=False
+        )
+        parser.add_argument(
+            "-mc",
+            "--metadata_cache",
+            help="(optional) Pass this flag to cache application, collection, business unit, team, workspace, and policy lookups in the user cache directory between runs.",
+            required=False,
+            action=argparse.BooleanOptionalAction
+        )
+        parser.add_argument(
+            "-mct",
+            "--metadata_cache_ttl",
+            help=f"(optional) Time (in minutes) for which cached lookups are considered valid - defaults to {DEFAULT_METADATA_CACHE_TTL}.",
+            type=int,
+            default=DEFAULT_METADATA_CACHE_TTL,
+            required=False
+        )
+        parser.add_argument(
+            "-nu",
+            "--native_upload",
+            help="(optional) Pass this flag to create the Policy/Sandbox scan and upload its files directly through the Veracode API, instead of starting the Veracode Java API Wrapper.",
+            required=False,
+            action=argparse.BooleanOptionalAction
+        )
+        parser.add_argument(
+            "-isca",
+            "--incremental_sca",
+            help="(optional) Pass this flag to run the agent-based SCA scan separately for each sub-project, skipping the sub-projects whose dependency manifests and lockfiles did not change since their last successful scan.",
+            required=False,
+            action=argparse.BooleanOptionalAction
+        )
+        parser.add_argument(
+            "-mpsca",
+            "--max_parallel_sca_scans",
+            help=f"(optional) Maximum number of sub-projects scanned at the same time by --incremental_sca - defaults to {DEFAULT_MAX_PARALLEL_SCA_SCANS}.",
+            type=int,
+            default=DEFAULT_MAX_PARALLEL_SCA_SCANS,
+            required=False
+        )
 
         args = parser.parse_args()
 
@@ -655,7 +897,6 @@ class ScanConfiguration:
         self.description = args.description
         self.application_tags = args.application_tags
         self.business_criticality = args.business_criticality
-        self.team_list = self.parse_team_list(args.team)
         self.application_custom_fields = self.parse_custom_field_list(args.application_custom_field)
         self.collection = args.collection
         self.collection_description = args.collection_description
@@ -669,13 +910,19 @@ class ScanConfiguration:
         self.pipeline_scan = args.pipeline_scan
         self.workspace_name = args.workspace_name
         self.sbom_type = args.sbom_type
+        self.sbom_pretty = args.sbom_pretty
+        self.sbom_compression = args.sbom_compression
         self.sandbox_name = args.sandbox_name
         self.version = args.version
         self.fail_build = args.fail_build        
         self.override_failure = args.override_failure
+        self.fail_fast = args.fail_fast
         self.vid = args.veracode_api_key_id
         self.vkey = args.veracode_api_key_secret        
         self.scan_timeout = args.scan_timeout
+        self.detach = args.detach
+        self.resume = args.resume
+        self.state_file = args.state_file
         self.veracode_cli_location = args.veracode_cli_location
         self.veracode_wrapper_location = args.veracode_wrapper_location
         self.include = args.include
@@ -701,5 +948,19 @@ class ScanConfiguration:
         self.cleanup_before_start = args.cleanup_before_start
         self.cleanup_before_exit = args.cleanup_before_exit
         self.fallback_sandbox = args.fallback_sandbox
+        self.hybrid_scan = args.hybrid_scan
+        self.fallback_artifacts = []
+        self.stream_pipeline_scans = args.stream_pipeline_scans
+        self.max_parallel_scans = args.max_parallel_scans
+        self.process_timeout = args.process_timeout
+        self.packaging_cache = args.packaging_cache
+        self.result_cache = args.result_cache
+        self.result_cache_size = args.result_cache_size
+        self.metadata_cache = args.metadata_cache
+        self.metadata_cache_ttl = args.metadata_cache_ttl
+        self.native_upload = args.native_upload
+        self.incremental_sca = args.incremental_sca
+        self.max_parallel_sca_scans = args.max_parallel_sca_scans
+        self.team_list = self.parse_team_list(args.team)
 
         self.validate_input()
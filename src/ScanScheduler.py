@@ -0,0 +1,64 @@
+import os
+import queue
+import itertools
+import threading
+from Constants import MEMORY_PER_PIPELINE_SCAN_IN_BYTES
+
+def get_meminfo_available_memory():
+    try:
+        with open("/proc/meminfo", 'r') as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def get_available_memory():
+    available_memory = get_meminfo_available_memory()
+    if available_memory is not None:
+        return available_memory
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def get_default_max_parallel_scans():
+    cpu_count = os.cpu_count() or 1
+    available_memory = get_available_memory()
+    if available_memory is None:
+        return cpu_count
+    return max(1, min(cpu_count, int(available_memory // MEMORY_PER_PIPELINE_SCAN_IN_BYTES)))
+
+class ScanScheduler:
+    work_queue : queue.PriorityQueue
+    workers : list[threading.Thread]
+
+    def __init__(self, max_workers: int):
+        self.work_queue = queue.PriorityQueue()
+        self.sequence = itertools.count()
+        self.workers = []
+        for _ in range(max_workers):
+            worker = threading.Thread(target=self.run_worker)
+            worker.start()
+            self.workers.append(worker)
+
+    def run_worker(self):
+        while True:
+            _, _, job = self.work_queue.get()
+            if job is None:
+                return
+            function, on_error = job
+            try:
+                function()
+            except (Exception, SystemExit) as e:
+                on_error(e)
+
+    def submit(self, function, size, on_error):
+        self.work_queue.put((-size, next(self.sequence), (function, on_error)))
+
+    def join(self):
+        for _ in self.workers:
+            self.work_queue.put((float("inf"), next(self.sequence), None))
+        for worker in self.workers:
+            worker.join()
\ No newline at end of file
@@ -0,0 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+class Task:
+    name : str
+    function : callable
+    dependencies : list[str]
+
+    def __init__(self, name, function, dependencies=[]):
+        self.name = name
+        self.function = function
+        self.dependencies = dependencies
+
+def is_ready(task: Task, task_names, completed_tasks):
+    return all(dependency in completed_tasks or dependency not in task_names for dependency in task.dependencies)
+
+def run_task_graph(tasks: list[Task], max_workers: int, on_failure=None):
+    task_names = set(map(lambda task: task.name, tasks))
+    pending_tasks = list(tasks)
+    completed_tasks = set()
+    running_tasks = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending_tasks or running_tasks:
+            for task in list(pending_tasks):
+                if is_ready(task, task_names, completed_tasks):
+                    running_tasks[executor.submit(task.function)] = task.name
+                    pending_tasks.remove(task)
+            if not running_tasks:
+                raise ValueError(f"Unable to resolve task dependencies for: {', '.join(map(lambda task: task.name, pending_tasks))}")
+            finished_tasks, _ = wait(running_tasks, return_when=FIRST_COMPLETED)
+            for finished_task in finished_tasks:
+                task_name = running_tasks.pop(finished_task)
+                if finished_task.exception() and on_failure:
+                    on_failure()
+                finished_task.result()
+                completed_tasks.add(task_name)
\ No newline at end of file
@@ -1,11 +1,24 @@
 from veracode_api_py.identity import BusinessUnits, Teams
 from veracode_api_py.collections import Collections
-from veracode_api_py.applications import Applications
+from veracode_api_py.applications import Applications, Sandboxes
 from veracode_api_py.policy import Policies
 from veracode_api_py.sca import Workspaces, SCAApplications, SBOM
-from veracode_api_py.policy import Policies
-from ErrorHandler import exit_with_error
-import pandas as pd
+from veracode_api_py.api import VeracodeAPI
+from veracode_api_py.apihelper import APIHelper
+from ErrorHandler import exit_with_error, show_warning
+import re
+import time
+import random
+import threading
+import requests
+from email.utils import parsedate_to_datetime
+import xml.etree.ElementTree as ElementTree
+from datetime import datetime, timezone
+from MetadataCache import run_cached
+from ApiSession import stream_api_request
+from Constants import CACHED_APPLICATION, CACHED_APPLICATION_GUID, CACHED_POLICY_NAME, CACHED_COLLECTION, CACHED_BUSINESS_UNIT, CACHED_TEAM, CACHED_WORKSPACE
+from Constants import BUILD_INFO_NAMESPACE, SCAN_IN_PROGRESS_STATUSES, SCA_PROJECT_PAGE_SIZE, STORED_APPLICATION, STORED_COLLECTION, STORED_POLICY
+from Constants import API_RETRYABLE_STATUS_CODES, API_THROTTLED_STATUS_CODE, API_MAX_RETRIES, API_RETRY_INITIAL_DELAY, API_RETRY_MAX_DELAY, API_RETRY_BUDGET, API_RETRY_BUDGET_REFILL
 
 def parse_custom_field_list(original_list, new_list):
     new_list = list(map(lambda custom_field: parse_custom_field(custom_field), new_list))
@@ -21,17 +34,169 @@ def parse_custom_field(custom_field):
         "value": custom_field.value
     }
 
-def try_to_run_and_return(input_parameter, function_to_run, scan_configuration):
+business_units_api = BusinessUnits()
+teams_api = Teams()
+collections_api = Collections()
+applications_api = Applications()
+sandboxes_api = Sandboxes()
+policies_api = Policies()
+workspaces_api = Workspaces()
+sca_applications_api = SCAApplications()
+veracode_api = VeracodeAPI()
+
+lookup_context = threading.local()
+retry_state = {"tokens": API_RETRY_BUDGET, "throttled_until": 0}
+retry_state_lock = threading.Lock()
+
+def get_request_exception(error):
+    while error is not None:
+        if isinstance(error, requests.exceptions.RequestException):
+            return error
+        error = error.__cause__ or error.__context__
+    return None
+
+def get_error_response(error):
+    request_exception = get_request_exception(error)
+    return request_exception.response if request_exception is not None else None
+
+def get_error_status_code(error):
+    response = get_error_response(error)
+    if response is not None:
+        return response.status_code
+    status_match = re.search(r"HTTP error: (\d{3})", str(error))
+    return int(status_match.group(1)) if status_match else None
+
+def is_retryable_error(error, idempotent):
+    status_code = get_error_status_code(error)
+    if status_code == API_THROTTLED_STATUS_CODE:
+        return True
+    if not idempotent:
+        return False
+    if status_code is not None:
+        return status_code in API_RETRYABLE_STATUS_CODES
+    return isinstance(get_request_exception(error), (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+def get_retry_after(error):
+    response = get_error_response(error)
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if not retry_after:
+        return 0
+    try:
+        return max(0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        return max(0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return 0
+
+def consume_retry_token():
+    with retry_state_lock:
+        if retry_state["tokens"] < 1:
+            return False
+        retry_state["tokens"] -= 1
+        return True
+
+def refill_retry_budget():
+    with retry_state_lock:
+        retry_state["tokens"] = min(API_RETRY_BUDGET, retry_state["tokens"] + API_RETRY_BUDGET_REFILL)
+
+def throttle_api_calls(delay):
+    with retry_state_lock:
+        retry_state["throttled_until"] = max(retry_state["throttled_until"], time.time() + delay)
+
+def wait_for_throttling():
+    with retry_state_lock:
+        throttled_time = retry_state["throttled_until"] - time.time()
+    if throttled_time > 0:
+        time.sleep(throttled_time)
+
+def run_with_retries(function_to_run, input_parameter, idempotent=True):
+    retry_delay = API_RETRY_INITIAL_DELAY
+    retries = 0
+    while True:
+        wait_for_throttling()
+        try:
+            result = function_to_run(input_parameter)
+        except Exception as e:
+            if retries >= API_MAX_RETRIES or not is_retryable_error(e, idempotent) or not consume_retry_token():
+                raise
+            status_code = get_error_status_code(e)
+            delay = max(get_retry_after(e), random.uniform(retry_delay / 2, retry_delay))
+            if status_code == API_THROTTLED_STATUS_CODE:
+                throttle_api_calls(delay)
+            show_warning(f"Veracode API call failed ({f'HTTP {status_code}' if status_code else type(get_request_exception(e)).__name__}), retrying in {delay:.1f} seconds")
+            time.sleep(delay)
+            retry_delay = min(retry_delay * 2, API_RETRY_MAX_DELAY)
+            retries += 1
+            continue
+        refill_retry_budget()
+        return result
+
+def handle_api_error(error, scan_configuration):
+    if getattr(lookup_context, "defer_errors", False):
+        raise error
+    exit_with_error(error, -1, scan_configuration)
+
+def try_to_run_and_return(input_parameter, function_to_run, scan_configuration, idempotent=True):
+    try:
+        return run_with_retries(function_to_run, input_parameter, idempotent)
+    except Exception as e:
+        handle_api_error(e, scan_configuration)
+
+def run_deferred_lookup(lookup_function, input_parameter, scan_configuration):
+    lookup_context.defer_errors = True
+    try:
+        return lookup_function(input_parameter, scan_configuration)
+    finally:
+        lookup_context.defer_errors = False
+
+def start_lookup(executor, lookup_function, input_parameter, scan_configuration):
+    return executor.submit(run_deferred_lookup, lookup_function, input_parameter, scan_configuration)
+
+def get_lookup_result(lookup, scan_configuration):
     try:
-        return function_to_run(input_parameter)
+        return lookup.result()
     except Exception as e:
-        exit_with_error(e, -1, scan_configuration)
+        handle_api_error(e, scan_configuration)
+
+object_store = {}
+object_store_lock = threading.Lock()
+
+def store_object(object_type, guid, veracode_object):
+    if guid and isinstance(veracode_object, dict) and veracode_object:
+        with object_store_lock:
+            object_store[(object_type, str(guid))] = veracode_object
+    return veracode_object
+
+def discard_stored_object(object_type, guid):
+    with object_store_lock:
+        object_store.pop((object_type, str(guid)), None)
+
+def get_stored_object(object_type, guid, fetch_function, is_complete=lambda _: True):
+    with object_store_lock:
+        veracode_object = object_store.get((object_type, str(guid)))
+    if veracode_object is None or not is_complete(veracode_object):
+        veracode_object = store_object(object_type, guid, fetch_function(guid))
+    return veracode_object
+
+def has_application_profile(application):
+    return "custom_fields" in application.get("profile", {})
+
+def has_policy_link(application):
+    return "policy" in application.get("_links", {})
+
+def has_collection_assets(collection):
+    return "asset_infos" in collection and "custom_fields" in collection
+
+def try_to_run_cached(object_type, input_parameter, function_to_run, scan_configuration):
+    return try_to_run_and_return(input_parameter, lambda cache_input: run_cached(object_type, cache_input, function_to_run, scan_configuration), scan_configuration)
 
 def get_business_unit_id(business_unit_name: str, scan_configuration):
-    return try_to_run_and_return(business_unit_name, inner_get_business_unit_id, scan_configuration)
+    return try_to_run_cached(CACHED_BUSINESS_UNIT, business_unit_name, inner_get_business_unit_id, scan_configuration)
 
 def inner_get_business_unit_id(business_unit_name: str):
-    matches = BusinessUnits().get_all()
+    matches = business_units_api.get_all()
     if not matches or len(matches) == 0:
         return None
     for match in matches:
@@ -40,80 +205,93 @@ def inner_get_business_unit_id(business_unit_name: str):
     return None
 
 def get_application_by_guid(application_guid: str, scan_configuration):
-    return try_to_run_and_return(application_guid, inner_get_application_by_guid, scan_configuration)
+    return try_to_run_cached(CACHED_APPLICATION_GUID, application_guid, inner_get_application_by_guid, scan_configuration)
 
 def inner_get_application_by_guid(application_guid: str):
-    return Applications().get(application_guid)
+    return get_stored_object(STORED_APPLICATION, application_guid, applications_api.get, has_application_profile)
 
 def get_application(application_name: str, scan_configuration):
-    return try_to_run_and_return(application_name, inner_get_application, scan_configuration)
+    return try_to_run_cached(CACHED_APPLICATION, application_name, inner_get_application, scan_configuration)
 
 def inner_get_application(application_name: str):
-    matches = Applications().get_by_name(application_name)
+    matches = applications_api.get_by_name(application_name)
     if not matches or len(matches) == 0:
         return None
     for match in matches:
         if match["profile"]["name"] == application_name.strip():
-            return match
+            return store_object(STORED_APPLICATION, match["guid"], match)
     return None
 
 
 def get_application_policy_name(application_guid: str, scan_configuration):
-    return try_to_run_and_return(application_guid, inner_get_application_policy_name, scan_configuration)
+    return try_to_run_cached(CACHED_POLICY_NAME, application_guid, inner_get_application_policy_name, scan_configuration)
 
 def inner_get_application_policy_name(application_guid):
-    match = Applications().get(application_guid)
+    match = get_stored_object(STORED_APPLICATION, application_guid, applications_api.get, has_policy_link)
     if not match or len(match) == 0:
         return None
     policy_guid = match["_links"]["policy"]["href"].split("/policies/")[1]
-    match = Policies().get(policy_guid)
+    match = get_stored_object(STORED_POLICY, policy_guid, policies_api.get)
     if not match or len(match) == 0:
         return None
     return match["name"]
 
 def get_collection_id(collection_name: str, scan_configuration):
-    return try_to_run_and_return(collection_name, inner_get_collection_id, scan_configuration)
+    return try_to_run_cached(CACHED_COLLECTION, collection_name, inner_get_collection_id, scan_configuration)
 
 def inner_get_collection_id(collection_name: str):
-    matches = Collections().get_by_name(collection_name)
+    matches = collections_api.get_by_name(collection_name)
     if not matches or len(matches) == 0:
         return None
     for match in matches:
         if match["name"] == collection_name.strip():
-            return match["guid"]
+            return store_object(STORED_COLLECTION, match["guid"], match)["guid"]
     return None
 
+team_index = None
+team_index_lock = threading.Lock()
+
+def get_team_index():
+    global team_index
+    with team_index_lock:
+        if team_index is None:
+            new_team_index = {}
+            for team in teams_api.get_all() or []:
+                new_team_index[team["team_name"]] = (team["team_id"], team["team_legacy_id"])
+            team_index = new_team_index
+    return team_index
+
 def get_team_ids(team_name: str, scan_configuration):
-    return try_to_run_and_return(team_name, inner_get_team_ids, scan_configuration)
+    return try_to_run_cached(CACHED_TEAM, team_name, inner_get_team_ids, scan_configuration)
 
 def inner_get_team_ids(team_name):
-    matches = Teams().get_all()
-    if not matches or len(matches) == 0:
-        return None, None
-    for match in matches:
-        if match["team_name"] == team_name.strip():
-            return match["team_id"], match["team_legacy_id"]
-    return None, None
+    return get_team_index().get(team_name.strip(), (None, None))
 
 def create_team(team_name: str, scan_configuration):
-    return try_to_run_and_return(team_name, inner_create_team, scan_configuration)
+    return try_to_run_and_return(team_name, inner_create_team, scan_configuration, idempotent=False)
 
 def inner_create_team(team_name: str):
-    team = Teams().create(team_name)
+    team = teams_api.create(team_name)
+    get_team_index()[team_name.strip()] = (team['team_id'], team["team_legacy_id"])
     return team['team_id'], team["team_legacy_id"]
 
+def get_indexed_team_ids(team):
+    if team.guid and team.legacy_id:
+        return team.guid, team.legacy_id
+    return get_team_index().get(team.name.strip(), (team.guid, team.legacy_id))
+
 def create_business_unit(scan_configuration):
-    return try_to_run_and_return(scan_configuration, inner_create_business_unit, scan_configuration)
+    return try_to_run_and_return(scan_configuration, inner_create_business_unit, scan_configuration, idempotent=False)
 
 def inner_create_business_unit(scan_configuration):
-    business_unit = BusinessUnits().create(scan_configuration.business_unit, list(map(lambda team: team.guid, scan_configuration.team_list)))
+    business_unit = business_units_api.create(scan_configuration.business_unit, list(map(lambda team: get_indexed_team_ids(team)[0], scan_configuration.team_list)))
     return business_unit["bu_id"]
 
 def get_workspace_id(workspace_name: str, scan_configuration):
-    return try_to_run_and_return(workspace_name, inner_get_workspace_id, scan_configuration)
+    return try_to_run_cached(CACHED_WORKSPACE, workspace_name, inner_get_workspace_id, scan_configuration)
 
 def inner_get_workspace_id(workspace_name: str):
-    matches = Workspaces().get_by_name(workspace_name)
+    matches = workspaces_api.get_by_name(workspace_name)
     if not matches or len(matches) == 0:
         return None
     for match in matches:
@@ -122,70 +300,115 @@ def inner_get_workspace_id(workspace_name: str):
     return None
 
 def create_application(scan_configuration):
-    return try_to_run_and_return(scan_configuration, inner_create_application, scan_configuration)
+    return try_to_run_and_return(scan_configuration, inner_create_application, scan_configuration, idempotent=False)
 
 def inner_create_application(scan_configuration):
-    application = Applications().create(app_name=scan_configuration.application, business_criticality=scan_configuration.business_criticality, 
+    application = applications_api.create(app_name=scan_configuration.application, business_criticality=scan_configuration.business_criticality, 
                                         description=scan_configuration.description, tags=scan_configuration.application_tags, git_repo_url=scan_configuration.git_repo_url,
                                         business_unit=scan_configuration.business_unit_guid, teams=list(map(lambda team: team.guid, scan_configuration.team_list)),
                                         custom_fields=parse_custom_field_list([], scan_configuration.application_custom_fields), 
                                         bus_owner_name=scan_configuration.business_owner, bus_owner_email=scan_configuration.business_owner_email,
                                         custom_kms_alias=scan_configuration.key_alias)
-    return application
+    return store_object(STORED_APPLICATION, application["guid"], application)
 
 def update_application(scan_configuration):
     return try_to_run_and_return(scan_configuration, inner_update_application, scan_configuration)
 
 def inner_update_application(scan_configuration):
-    original_application = Applications().get(guid=scan_configuration.application_guid)
+    original_application = get_stored_object(STORED_APPLICATION, scan_configuration.application_guid, applications_api.get, has_application_profile)
     custom_fields=list(map(lambda custom_field: custom_field, original_application["profile"]["custom_fields"])) if original_application["profile"]["custom_fields"] else []
     custom_fields=parse_custom_field_list(custom_fields, scan_configuration.application_custom_fields)
-    application = Applications().update(guid=scan_configuration.application_guid, app_name=scan_configuration.application,business_criticality=scan_configuration.business_criticality, 
+    if get_application_state(original_application["profile"]) == get_application_state(build_application_profile(scan_configuration, custom_fields)):
+        return False
+    discard_stored_object(STORED_APPLICATION, scan_configuration.application_guid)
+    application = applications_api.update(guid=scan_configuration.application_guid, app_name=scan_configuration.application,business_criticality=scan_configuration.business_criticality, 
                                         description=scan_configuration.description, tags=scan_configuration.application_tags, git_repo_url=scan_configuration.git_repo_url,
                                         business_unit=scan_configuration.business_unit_guid, teams=list(map(lambda team: team.guid, scan_configuration.team_list)),
                                         custom_fields=custom_fields, 
                                         bus_owner_name=scan_configuration.business_owner, bus_owner_email=scan_configuration.business_owner_email,
                                         custom_kms_alias=scan_configuration.key_alias)
-    return application["guid"]
+    store_object(STORED_APPLICATION, scan_configuration.application_guid, application)
+    return True
+
+def build_application_profile(scan_configuration, custom_fields):
+    has_business_owner = scan_configuration.business_owner is not None and scan_configuration.business_owner_email is not None
+    return {"name": scan_configuration.application, "business_criticality": scan_configuration.business_criticality, "description": scan_configuration.description,
+            "tags": scan_configuration.application_tags, "git_repo_url": scan_configuration.git_repo_url, "custom_kms_alias": scan_configuration.key_alias,
+            "business_unit": {"guid": scan_configuration.business_unit_guid} if scan_configuration.business_unit_guid else None,
+            "teams": list(map(lambda team: {"guid": team.guid}, scan_configuration.team_list)), "custom_fields": custom_fields,
+            "business_owners": [{"name": scan_configuration.business_owner, "email": scan_configuration.business_owner_email}] if has_business_owner else []}
+
+def get_application_state(profile):
+    return {"name": normalise_text(profile.get("name")), "business_criticality": normalise_text(profile.get("business_criticality")).upper().replace(" ", "_"),
+            "description": normalise_text(profile.get("description")), "tags": normalise_text(profile.get("tags")), "git_repo_url": normalise_text(profile.get("git_repo_url")),
+            "custom_kms_alias": normalise_text(profile.get("custom_kms_alias")), "business_unit": get_business_unit_guid(profile),
+            "teams": get_guids(profile.get("teams")), "custom_fields": normalise_custom_fields(profile.get("custom_fields")),
+            "business_owners": sorted(map(lambda owner: (normalise_text(owner.get("name")), normalise_text(owner.get("email"))), profile.get("business_owners") or []))}
+
+def normalise_text(value):
+    return str(value).strip() if value is not None else ""
+
+def get_business_unit_guid(veracode_object):
+    return normalise_text((veracode_object.get("business_unit") or {}).get("guid"))
+
+def get_guids(veracode_objects):
+    return sorted(map(lambda veracode_object: normalise_text(veracode_object.get("guid")), veracode_objects or []))
+
+def normalise_custom_fields(custom_fields):
+    return sorted(map(lambda custom_field: (normalise_text(custom_field.get("name")), normalise_text(custom_field.get("value"))), custom_fields or []))
 
 def create_collection(scan_configuration):
-    return try_to_run_and_return(scan_configuration, inner_create_collection, scan_configuration)
+    return try_to_run_and_return(scan_configuration, inner_create_collection, scan_configuration, idempotent=False)
 
 def inner_create_collection(scan_configuration):
-    collection = Collections().create(name=scan_configuration.collection, description=scan_configuration.collection_description,
+    collection = collections_api.create(name=scan_configuration.collection, description=scan_configuration.collection_description,
                                     business_unit_guid=scan_configuration.business_unit_guid, 
                                     custom_fields=parse_custom_field_list([], scan_configuration.collection_custom_fields),
                                     assets=[scan_configuration.application_guid], tags=scan_configuration.collection_tags)
-    return collection["guid"]
+    return store_object(STORED_COLLECTION, collection["guid"], collection)["guid"]
 
 def update_collection(scan_configuration):
     return try_to_run_and_return(scan_configuration, inner_update_collection, scan_configuration)
 
 def inner_update_collection(scan_configuration):
-    original_collection = Collections().get(guid=scan_configuration.collection_guid)
+    original_collection = get_stored_object(STORED_COLLECTION, scan_configuration.collection_guid, collections_api.get, has_collection_assets)
     assets=list(map(lambda asset: asset["guid"], original_collection["asset_infos"]))
     if not scan_configuration.application_guid in assets:
         assets.append(scan_configuration.application_guid)
     custom_fields=list(map(lambda custom_field: custom_field, original_collection["custom_fields"])) if original_collection["custom_fields"] else []
     custom_fields=parse_custom_field_list(custom_fields, scan_configuration.collection_custom_fields)
-    collection = Collections().update(guid=scan_configuration.collection_guid, name=scan_configuration.collection, description=scan_configuration.collection_description,
+    if get_collection_state(original_collection) == get_collection_state(build_collection(scan_configuration, custom_fields, assets)):
+        return False
+    discard_stored_object(STORED_COLLECTION, scan_configuration.collection_guid)
+    collection = collections_api.update(guid=scan_configuration.collection_guid, name=scan_configuration.collection, description=scan_configuration.collection_description,
                                     business_unit_guid=scan_configuration.business_unit_guid, 
                                     custom_fields=custom_fields, 
                                     assets=assets, tags=scan_configuration.collection_tags)
-    return collection["guid"]
+    store_object(STORED_COLLECTION, scan_configuration.collection_guid, collection)
+    return True
+
+def build_collection(scan_configuration, custom_fields, assets):
+    return {"name": scan_configuration.collection, "description": scan_configuration.collection_description, "tags": scan_configuration.collection_tags,
+            "business_unit": {"guid": scan_configuration.business_unit_guid} if scan_configuration.business_unit_guid else None,
+            "custom_fields": custom_fields, "asset_infos": list(map(lambda asset: {"guid": asset}, assets))}
+
+def get_collection_state(collection):
+    return {"name": normalise_text(collection.get("name")), "description": normalise_text(collection.get("description")), "tags": normalise_text(collection.get("tags")),
+            "business_unit": get_business_unit_guid(collection), "custom_fields": normalise_custom_fields(collection.get("custom_fields")),
+            "assets": get_guids(collection.get("asset_infos"))}
 
 def create_workspace(scan_configuration):
-    return try_to_run_and_return(scan_configuration, inner_create_workspace, scan_configuration)
+    return try_to_run_and_return(scan_configuration, inner_create_workspace, scan_configuration, idempotent=False)
 
 def inner_create_workspace(scan_configuration):
-    workspace = Workspaces().create(name=scan_configuration.workspace_name)
+    workspace = workspaces_api.create(name=scan_configuration.workspace_name)
     return workspace
 
 def create_sca_token(scan_configuration):
-    return try_to_run_and_return(scan_configuration, inner_create_sca_token, scan_configuration)
+    return try_to_run_and_return(scan_configuration, inner_create_sca_token, scan_configuration, idempotent=False)
 
 def inner_create_sca_token(scan_configuration):
-    agent = Workspaces().create_agent(scan_configuration.workspace_guid, scan_configuration.sca_agent_name)
+    agent = workspaces_api.create_agent(scan_configuration.workspace_guid, scan_configuration.sca_agent_name)
     return agent["token"]["access_token"], agent["id"]
 
 def add_teams_to_workspace(scan_configuration):
@@ -193,23 +416,24 @@ def add_teams_to_workspace(scan_configuration):
 
 def inner_add_teams_to_workspace(scan_configuration):
     for team in scan_configuration.team_list:
-        Workspaces().add_team(scan_configuration.workspace_guid, team.legacy_id)
+        workspaces_api.add_team(scan_configuration.workspace_guid, get_indexed_team_ids(team)[1])
     return True
 
 def expire_srcclr_token(scan_configuration):
     return try_to_run_and_return(scan_configuration, inner_expire_srcclr_token, scan_configuration)
 
 def inner_expire_srcclr_token(scan_configuration):
-    Workspaces().delete_agent(scan_configuration.workspace_guid, scan_configuration.agent_id)
+    workspaces_api.delete_agent(scan_configuration.workspace_guid, scan_configuration.agent_id)
     return True
 
 def link_sca_project(sca_results_message, scan_configuration):
     return try_to_run_and_return({"scan_id": sca_results_message, "scan_configuration": scan_configuration}, inner_link_sca_project, scan_configuration)
 
-def inner_link_sca_project(linking_information, scan_configuration):
+def inner_link_sca_project(linking_information):
     project_id = inner_get_scan_project_guid(linking_information)
     if project_id:
-        SCAApplications().link_project(scan_configuration.application_guid, project_id)
+        sca_applications_api.link_project(linking_information["scan_configuration"].application_guid, project_id)
+    return project_id
 
 def get_scan_project_guid(sca_results_message, scan_configuration):
     return try_to_run_and_return({"scan_id": sca_results_message, "scan_configuration": scan_configuration}, inner_get_scan_project_guid, scan_configuration)
@@ -218,30 +442,103 @@ def inner_get_scan_project_guid(project_information):
     scan_id = project_information["scan_id"]
     scan_configuration = project_information["scan_configuration"]
     workspace_id = scan_configuration.workspace_guid
-    scan = Workspaces().get_scan(scan_id)
+    scan = workspaces_api.get_scan(scan_id)
     return get_project_id_for_scan_date(workspace_id, scan["date"])
 
+workspace_project_indexes = {}
+workspace_project_index_lock = threading.Lock()
+
 def get_project_id_for_scan_date(workspace_id, scan_date):
-    projects = Workspaces().get_projects(workspace_id)
-    if projects:
-        for project in projects:
-            if are_equal_datetimes(project["last_scan_date"], scan_date):
-                return project["id"]
-    return ""
-
-def are_equal_datetimes(first_datetime, second_datetime):
-    first_datetime = pd.to_datetime(first_datetime)
-    second_datetime = pd.to_datetime(second_datetime)
-    return first_datetime == second_datetime
+    try:
+        scan_datetime = parse_datetime(scan_date)
+    except (TypeError, ValueError):
+        return ""
+    with workspace_project_index_lock:
+        project_index = workspace_project_indexes.setdefault(workspace_id, {})
+        if not scan_datetime in project_index:
+            index_workspace_projects(workspace_id, scan_datetime, project_index)
+        return project_index.get(scan_datetime, "")
+
+def index_workspace_projects(workspace_id, scan_datetime, project_index):
+    page = 0
+    total_pages = 1
+    while page < total_pages and not scan_datetime in project_index:
+        projects_page = APIHelper()._rest_request(f"{Workspaces.sca_base_url}/{workspace_id}/projects", "GET", params={"page": page, "size": SCA_PROJECT_PAGE_SIZE})
+        for project in projects_page.get("_embedded", {}).get("projects", []):
+            try:
+                project_index[parse_datetime(project["last_scan_date"])] = project["id"]
+            except (KeyError, TypeError, ValueError):
+                continue
+        total_pages = projects_page.get("page", {}).get("total_pages", 0)
+        page += 1
+
+def parse_datetime(datetime_value):
+    if isinstance(datetime_value, datetime):
+        parsed_datetime = datetime_value
+    else:
+        normalised_datetime = str(datetime_value).strip().replace(" ", "T", 1)
+        if normalised_datetime[-1:] in ["Z", "z"]:
+            normalised_datetime = normalised_datetime[:-1] + "+00:00"
+        normalised_datetime = re.sub(r"\.(\d+)", lambda fraction: "." + (fraction.group(1) + "000000")[:6], normalised_datetime, count=1)
+        normalised_datetime = re.sub(r"([+-]\d{2})(\d{2})$", r"\1:\2", normalised_datetime)
+        parsed_datetime = datetime.fromisoformat(normalised_datetime)
+    return parsed_datetime if parsed_datetime.tzinfo else parsed_datetime.replace(tzinfo=timezone.utc)
+
+def is_build_in_progress(scan_configuration):
+    try:
+        return run_with_retries(inner_is_build_in_progress, scan_configuration)
+    except Exception as e:
+        show_warning(f"Unable to check the status of the previous scan: {e}")
+        return None
+
+def inner_is_build_in_progress(scan_configuration):
+    sandbox_legacy_id = None
+    if scan_configuration.sandbox_name:
+        sandbox_legacy_id = get_sandbox_legacy_id(scan_configuration)
+        if not sandbox_legacy_id:
+            return False
+    build = inner_get_build({"scan_configuration": scan_configuration, "sandbox_id": sandbox_legacy_id, "build_id": None})
+    return build is not None and get_build_status(build) in SCAN_IN_PROGRESS_STATUSES
+
+def get_sandbox_id(scan_configuration):
+    return run_with_retries(get_sandbox_legacy_id, scan_configuration)
+
+def get_sandbox_legacy_id(scan_configuration):
+    for sandbox in sandboxes_api.get_all(scan_configuration.application_guid) or []:
+        if sandbox["name"] == scan_configuration.sandbox_name.strip():
+            return sandbox["id"]
+    return None
+
+def get_build(scan_configuration, sandbox_id, build_id=None):
+    return run_with_retries(inner_get_build, {"scan_configuration": scan_configuration, "sandbox_id": sandbox_id, "build_id": build_id})
+
+def inner_get_build(build_information):
+    build_info = ElementTree.fromstring(veracode_api.get_build_info(build_information["scan_configuration"].application_legacy_id,
+                                                                    build_id=build_information["build_id"], sandbox_id=build_information["sandbox_id"]))
+    return build_info.find(f"{{{BUILD_INFO_NAMESPACE}}}build")
+
+def get_build_status(build):
+    analysis_unit = build.find(f"{{{BUILD_INFO_NAMESPACE}}}analysis_unit")
+    return (analysis_unit.get("status", "") if analysis_unit is not None else "").lower() or "incomplete"
+
+def get_sbom(target_guid, target_type, scan_configuration):
+    sbom_format = scan_configuration.sbom_type.lower()
+    params = {"type": target_type, "vulnerability": True}
+    if sbom_format == "spdx":
+        params["dependency"] = True
+    return stream_api_request(f"{APIHelper().base_rest_url}{SBOM.entity_base_uri}/targets/{target_guid}/{sbom_format}", params)
 
 def get_upload_sbom(scan_configuration):
     return try_to_run_and_return(scan_configuration, inner_get_upload_sbom, scan_configuration)
 
 def inner_get_upload_sbom(scan_configuration):
-    return SBOM().get(scan_configuration.application_guid, scan_configuration.sbom_type)
+    return get_sbom(scan_configuration.application_guid, "application", scan_configuration)
 
 def get_agent_sbom(scan_configuration):
     return try_to_run_and_return(scan_configuration, inner_get_agent_sbom, scan_configuration)
 
 def inner_get_agent_sbom(scan_configuration):
-    return SBOM().get_for_project(scan_configuration.project_guid, scan_configuration.sbom_type)
+    return get_sbom(scan_configuration.project_guid, "agent", scan_configuration)
+
+def get_project_sbom(project_guid, scan_configuration):
+    return try_to_run_and_return(project_guid, lambda project: get_sbom(project, "agent", scan_configuration), scan_configuration)
@@ -4,6 +4,9 @@ from Constants import PACKAGER_OUTPUT
 from CliCaller import call_subprocess
 from ScanConfiguration import ScanConfiguration
 from ErrorHandler import exit_with_error
+from ColourHandler import INFO_PREFIX_COLOUR, RESET_STYLE
+from ParallelScanHandler import is_cancelled
+from PackagingCache import get_packaging_manifest_location, read_packaging_manifest, save_packaging_manifest, get_source_fingerprint, has_artifacts
 
 def clear_directory(directory, scan_configuration):
     if not os.path.exists(directory):
@@ -18,8 +21,20 @@ def clear_directory(directory, scan_configuration):
         except OSError as e:
             exit_with_error(f'Failed to delete file {file_path}. Reason: {e}', -5, scan_configuration)
 
+def get_artifacts_directory(scan_configuration: ScanConfiguration) -> str:
+    return os.path.join(scan_configuration.base_cli_directory, PACKAGER_OUTPUT, scan_configuration.application)
+
 def package_application(scan_source: str, scan_configuration: ScanConfiguration) -> str:
-    artifacts_directory = os.path.join(scan_configuration.base_cli_directory, PACKAGER_OUTPUT, scan_configuration.application)
+    artifacts_directory = get_artifacts_directory(scan_configuration)
+
+    fingerprint = None
+    if scan_configuration.packaging_cache:
+        manifest_location = get_packaging_manifest_location(scan_source, scan_configuration)
+        manifest = read_packaging_manifest(manifest_location)
+        fingerprint, file_hashes = get_source_fingerprint(scan_source, manifest.get("files", {}), scan_configuration)
+        if fingerprint == manifest.get("fingerprint") and has_artifacts(artifacts_directory):
+            print(f"{INFO_PREFIX_COLOUR}Veracode Packager:{RESET_STYLE} source unchanged since last build, reusing artifacts at {artifacts_directory}")
+            return artifacts_directory
     
     if scan_configuration.cleanup_before_start:
         clear_directory(artifacts_directory, scan_configuration)
@@ -27,12 +42,16 @@ def package_application(scan_source: str, scan_configuration: ScanConfiguration)
     package_commands = [scan_configuration.veracode_cli_location, "package", "--source", scan_source, "--output", artifacts_directory, "--trust"]
     if scan_configuration.verbose:
         package_commands.append("-d")
-    call_subprocess("Veracode Packager", scan_configuration, True, package_commands)    
+    if is_cancelled(call_subprocess("Veracode Packager", scan_configuration, True, package_commands)):
+        print(f"{INFO_PREFIX_COLOUR}Veracode Packager:{RESET_STYLE} cancelled, no further scans will be started")
+        return None
     if scan_configuration.ignore_artifacts:
         for ignore_artifact in scan_configuration.ignore_artifacts:
             ignore_path = os.path.join(artifacts_directory, ignore_artifact)
             if os.path.exists(ignore_path):
                 os.remove(ignore_path)
+    if fingerprint:
+        save_packaging_manifest(manifest_location, fingerprint, file_hashes)
     return artifacts_directory
 
 def get_policy_file_name(scan_configuration: ScanConfiguration) -> str:
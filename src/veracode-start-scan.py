@@ -1,12 +1,92 @@
 import os
+import sys
+import time
+import signal
 import shutil
+import threading
+from pathlib import Path
 from ScanConfiguration import ScanConfiguration
-from PipelineScan import start_pipeline_scan, validate_pipeline_scan_artifacts
-from PlatformScan import start_platform_scan
-from VeracodeCli import package_application
-from PreScan import pre_scan_actions
+from ParallelScanHandler import parse_all_results
+from CliCaller import get_absolute_file_path, cancel_all_processes
+from TaskGraph import Task, run_task_graph
 from ErrorHandler import exit_with_error, show_warning
 
+PACKAGING_TASK = "Packaging"
+PRE_SCAN_TASK = "Platform Setup"
+AGENT_SCA_TASK = "Agent SCA"
+STATIC_SCAN_TASK = "Static Scan"
+
+def prepare_scan_source(scan_configuration: ScanConfiguration):
+    from VeracodeCli import package_application
+    from PipelineScan import validate_pipeline_scan_artifacts
+    if scan_configuration.scan_type == 'folder':
+        artifacts_directory = package_application(scan_configuration.source, scan_configuration)
+        if not artifacts_directory:
+            return False
+        scan_configuration.source = artifacts_directory
+        scan_configuration.has_generated_files = True
+
+    if not os.path.isdir(scan_configuration.source) or not os.listdir(scan_configuration.source):
+        exit_with_error(f"Packaging failed - no files generated at {scan_configuration.source}", -1, scan_configuration)        
+
+    if scan_configuration.pipeline_scan and not scan_configuration.stream_pipeline_scans:
+        validate_pipeline_scan_artifacts(scan_configuration)
+    return True
+
+def prepare_streamed_scan_source(scan_configuration: ScanConfiguration, packaging_finished: threading.Event, packaging_succeeded: threading.Event):
+    try:
+        if prepare_scan_source(scan_configuration):
+            packaging_succeeded.set()
+    finally:
+        packaging_finished.set()
+
+def start_agent_sca(scan_configuration: ScanConfiguration, returned_values, base_results_location):
+    from AgentScanner import run_agent_sca
+    if scan_configuration.srcclr_token:
+        run_agent_sca(returned_values, os.path.join(base_results_location, "sca_results.txt"), scan_configuration)
+
+def start_static_scan(scan_configuration: ScanConfiguration, returned_values):
+    if scan_configuration.pipeline_scan:
+        from PipelineScan import start_pipeline_scan
+        start_pipeline_scan(scan_configuration, returned_values)
+    else:
+        from PlatformScan import start_platform_scan
+        start_platform_scan(scan_configuration, returned_values)
+
+def run_all_scans(scan_configuration: ScanConfiguration):
+    from PreScan import pre_scan_actions
+    from PipelineScan import stream_pipeline_scans
+    from VeracodeApi import expire_srcclr_token
+    returned_values = {}
+    base_results_location = get_absolute_file_path(scan_configuration.base_cli_directory, "scan_results")
+    Path(base_results_location).mkdir(parents=True, exist_ok=True)
+    tasks = [Task(PRE_SCAN_TASK, lambda: pre_scan_actions(scan_configuration)),
+             Task(AGENT_SCA_TASK, lambda: start_agent_sca(scan_configuration, returned_values, base_results_location), [PRE_SCAN_TASK])]
+    if scan_configuration.stream_pipeline_scans:
+        packaging_finished = threading.Event()
+        packaging_succeeded = threading.Event()
+        packaging_start_time = time.time()
+        tasks.append(Task(PACKAGING_TASK, lambda: prepare_streamed_scan_source(scan_configuration, packaging_finished, packaging_succeeded)))
+        tasks.append(Task(STATIC_SCAN_TASK, lambda: stream_pipeline_scans(scan_configuration, returned_values, packaging_finished, packaging_succeeded, packaging_start_time), [PRE_SCAN_TASK]))
+    else:
+        tasks.append(Task(PACKAGING_TASK, lambda: prepare_scan_source(scan_configuration)))
+        tasks.append(Task(STATIC_SCAN_TASK, lambda: start_static_scan(scan_configuration, returned_values), [PACKAGING_TASK, PRE_SCAN_TASK]))
+    try:
+        run_task_graph(tasks, len(tasks), cancel_all_processes)
+    finally:
+        if scan_configuration.srcclr_token:
+            expire_srcclr_token(scan_configuration)
+
+    parse_all_results(scan_configuration, returned_values)
+
+def handle_termination_signal(signal_number, _):
+    cancel_all_processes()
+    sys.exit(128 + signal_number)
+
+def install_termination_handlers():
+    for termination_signal in [signal.SIGINT, signal.SIGTERM]:
+        signal.signal(termination_signal, handle_termination_signal)
+
 def main():
     old_lower_veracode_api_key_id = os.environ.get('veracode_api_key_id', "")
     old_lower_veracode_api_key_secret = os.environ.get('veracode_api_key_secret', "")
@@ -17,26 +97,20 @@ def main():
     old_https_proxy = os.environ.get('https_proxy', "")
     old_https_proxy_caps = os.environ.get('HTTPS_PROXY', "")
     scan_configuration = None
+    install_termination_handlers()
 
     try:
         scan_configuration = ScanConfiguration()
-
-        if scan_configuration.scan_type == 'folder':
-            scan_configuration.source = package_application(scan_configuration.source, scan_configuration)
-            scan_configuration.has_generated_files = True
-
-        if not os.path.isdir(scan_configuration.source) or not os.listdir(scan_configuration.source):
-            exit_with_error(f"Packaging failed - no files generated at {scan_configuration.source}", -1, scan_configuration)        
-
-        if scan_configuration.pipeline_scan:
-            validate_pipeline_scan_artifacts(scan_configuration)
-
-        scan_configuration = pre_scan_actions(scan_configuration)
-        if scan_configuration.pipeline_scan:
-            start_pipeline_scan(scan_configuration)
+        if scan_configuration.resume:
+            from ResultPoller import resume_platform_scan
+            resume_platform_scan(scan_configuration)
         else:
-            start_platform_scan(scan_configuration)
+            run_all_scans(scan_configuration)
     finally:
+        cancel_all_processes()
+        if scan_configuration and scan_configuration.verbose:
+            from ApiSession import print_api_session_statistics
+            print_api_session_statistics()
         os.environ['veracode_api_key_id'] = old_lower_veracode_api_key_id
         os.environ['VERACODE_API_KEY_ID'] = old_upper_veracode_api_key_id
         os.environ['veracode_api_key_secret'] = old_lower_veracode_api_key_secret